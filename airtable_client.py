@@ -4,8 +4,17 @@ Fetches product data from the Equipment Catalog table using pyairtable
 """
 
 import os
-from typing import Optional, Dict, List, Any
+import re
+import sys
+import json
+import time
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from collections import OrderedDict, deque
+from typing import Optional, Dict, List, Set, Tuple, Any
 from pathlib import Path
+from urllib.parse import quote
 from dotenv import load_dotenv
 
 # Load credentials from .env file
@@ -15,12 +24,121 @@ load_dotenv(Path(__file__).parent.parent / ".env")
 
 # Try to import pyairtable
 try:
-    from pyairtable import Api, Table
+    from pyairtable import Api, Table, retry_strategy
+    from requests.exceptions import HTTPError
     PYAIRTABLE_AVAILABLE = True
 except ImportError:
     PYAIRTABLE_AVAILABLE = False
     print("⚠️  pyairtable not installed. Run: pip3 install pyairtable")
 
+# Fuzzy lookup index settings
+FUZZY_PREFIX_LEN = 4  # Bucket keys by their first N characters
+FUZZY_NGRAM_LEN = 3   # Substring index granularity
+
+# Local copy of the catalog, reused across runs until it is CACHE_TTL seconds old
+CACHE_FILE = Path(os.getenv("AIRTABLE_CACHE_FILE", Path(__file__).parent / "airtable_catalog_cache.json"))
+CACHE_TTL = int(os.getenv("AIRTABLE_CACHE_TTL", "3600"))  # 0 disables the disk cache
+
+# Most recent fuzzy-lookup results to remember (query -> product)
+LOOKUP_CACHE_SIZE = int(os.getenv("AIRTABLE_LOOKUP_CACHE_SIZE", "4096"))
+
+# Most recent queries known to match nothing, so repeats skip the fuzzy scan
+MISS_CACHE_SIZE = int(os.getenv("AIRTABLE_MISS_CACHE_SIZE", "4096"))
+
+# Airtable returns at most 100 records per page
+PAGE_SIZE = 100
+
+# Retries for rate-limited (429) and transient 5xx responses. Waits grow
+# exponentially from RETRY_BACKOFF seconds; a Retry-After header wins.
+MAX_RETRIES = int(os.getenv("AIRTABLE_MAX_RETRIES", "5"))
+RETRY_BACKOFF = float(os.getenv("AIRTABLE_RETRY_BACKOFF", "2"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)  # pyairtable's default is 429 only
+
+# Models per filtered query in lookup_by_models (kept under PAGE_SIZE so
+# each batch normally comes back in a single page)
+LOOKUP_BATCH_SIZE = 95
+
+# Longest URL-encoded filterByFormula per lookup_by_models query. The formula
+# travels in the GET query string and Airtable rejects long request URLs
+# (414/422), so batches are closed early once they reach this size.
+MAX_FORMULA_LENGTH = 4000
+
+# Fields compared against the query in lookup_by_models
+LOOKUP_MATCH_FIELDS = ('Model', 'Model Number', 'Part Number')
+
+# Airtable field names accepted for each spec, in priority order
+SPEC_FIELD_ALIASES = {
+    'height_u': ('Height (U)', 'Rack Units', 'RU', 'U Height', 'Height', 'Size (U)'),
+    'watts': ('Watts', 'Power (W)', 'Power', 'Wattage', 'Power Consumption'),
+    'btu': ('BTU', 'BTU/hr', 'Heat Output', 'Thermal'),
+    'weight': ('Weight', 'Weight (lbs)', 'Weight (lb)', 'Mass'),
+    'subsystem': ('Subsystem', 'System', 'Category', 'Type', 'Department'),
+}
+
+# Reverse map: field name -> [(spec, priority)]. A field can feed more than
+# one spec (e.g. 'Category' is also a subsystem hint).
+SPEC_ALIAS_LOOKUP: Dict[str, List[tuple]] = {}
+for _spec, _aliases in SPEC_FIELD_ALIASES.items():
+    for _priority, _alias in enumerate(_aliases):
+        SPEC_ALIAS_LOOKUP.setdefault(_alias, []).append((_spec, _priority))
+
+
+@lru_cache(maxsize=1024)
+def _spec_field_plan(field_names: Tuple[str, ...]) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """
+    Work out which of a record's fields feed each spec, in priority order.
+    
+    Records from one table mostly share the same set of fields, so the plan
+    is computed once per distinct field layout instead of once per record.
+    """
+    found: Dict[str, List[tuple]] = {}
+    for field_name in field_names:
+        for spec, priority in SPEC_ALIAS_LOOKUP.get(field_name, ()):
+            found.setdefault(spec, []).append((priority, field_name))
+    
+    return tuple(
+        (spec, tuple(field_name for _, field_name in sorted(candidates)))
+        for spec, candidates in found.items()
+    )
+
+
+# Subsystem keywords, matched anywhere in the value (network wins over AV).
+# Kept as two patterns because a single alternation would return whichever
+# keyword appears first in the text rather than honouring that priority.
+NETWORK_SUBSYSTEM_RE = re.compile('network|net|switch|router|wifi|lan', re.IGNORECASE)
+AV_SUBSYSTEM_RE = re.compile('av|audio|video|control|lighting|savant|lutron', re.IGNORECASE)
+
+# Identifier/display fields read from every record
+RECORD_FIELDS = (
+    'Name', 'Brand', 'Model', 'Model Number', 'Part Number',
+    'Category', 'Type', 'Connections', 'Front Image',
+)
+
+# Every field read while building the cache. Only the ones the table
+# actually has are requested - Airtable rejects unknown names (422).
+CATALOG_FIELDS = list(dict.fromkeys([*RECORD_FIELDS, *SPEC_ALIAS_LOOKUP]))
+
+
+@dataclass(slots=True)
+class CatalogProduct:
+    """A product from the Equipment Catalog (one per Airtable record)"""
+    record_id: Optional[str] = None
+    name: str = ""
+    brand: str = ""
+    model: str = ""
+    part_number: str = ""
+    rack_units: Optional[int] = None
+    height_u: Optional[int] = None
+    watts: Optional[float] = None
+    btu: Optional[float] = None
+    weight: Optional[float] = None
+    subsystem: str = ""  # 'AV' or 'Network' or 'Power' etc.
+    is_rack_mountable: bool = False
+    category: str = ""
+    connections: Any = field(default_factory=dict)
+    front_image: Optional[str] = None
+    source: str = 'airtable'
+
 
 class AirtableBrain:
     """
@@ -46,81 +164,311 @@ class AirtableBrain:
                 "  AIRTABLE_BASE_ID=appUhE8Eg7AY7KBMX"
             )
         
-        # Initialize pyairtable
-        self.api = Api(self.api_key)
+        # Initialize pyairtable (backs off and retries on rate limits and 5xx errors)
+        self.api = Api(
+            self.api_key,
+            retry_strategy=retry_strategy(
+                total=MAX_RETRIES,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+            ),
+        )
         self.table = self.api.table(self.base_id, self.table_name)
         
+        # CATALOG_FIELDS present in the table, read from its schema on first use
+        # (None: schema unavailable, fetch every field)
+        self._projection: Optional[List[str]] = None
+        self._projection_checked = False
+        
         # Cache for product lookups
-        self._product_cache: Dict[str, Dict] = {}
+        self._products_by_id: Dict[str, CatalogProduct] = {}  # One entry per record
+        self._alias_to_id: Dict[str, str] = {}  # Lookup key -> record id
         self._cache_loaded = False
+        self._load_lock = threading.Lock()
+        
+        # Secondary indexes over cache keys for fuzzy lookups
+        self._prefix_index: Dict[str, List[str]] = {}
+        self._ngram_index: Dict[str, List[str]] = {}
+        
+        # LRU of resolved fuzzy lookups, bounded by LOOKUP_CACHE_SIZE
+        self._fuzzy_memo: "OrderedDict[str, CatalogProduct]" = OrderedDict()
+        
+        # Queries that matched nothing, evicted oldest-first via _miss_order
+        self._miss_cache: Set[str] = set()
+        self._miss_order: deque = deque()
     
     def _load_all_products(self) -> None:
-        """Load all products from Airtable into cache"""
+        """Load all products into cache (once, even with concurrent callers)"""
         if self._cache_loaded:
             return
         
+        with self._load_lock:
+            # Another thread may have finished loading while we waited
+            if not self._cache_loaded:
+                self._load_catalog()
+    
+    def warm_cache(self) -> None:
+        """Load the catalog ahead of the first lookup (safe to run in a background thread)"""
+        try:
+            self._load_all_products()
+        except Exception as e:
+            print(f"⚠️  Could not preload the catalog (the next lookup retries): {e}")
+    
+    def _load_catalog(self) -> None:
+        """Load all products into cache, from the local disk cache if it is fresh"""
+        records = self._read_disk_cache()
+        if records is not None:
+            try:
+                key_pairs = [pair for record in records for pair in self._add_record(record)]
+            except (KeyError, TypeError, AttributeError, ValueError) as e:
+                # Records of the wrong shape - treat it as a cache miss
+                print(f"⚠️  Ignoring unreadable catalog cache: {e!r}")
+                self._products_by_id = {}
+            else:
+                self._install_lookup_keys(key_pairs)
+                self._cache_loaded = True
+                print(f"✅ Loaded {len(records)} products from local cache ({CACHE_FILE.name})")
+                return
+        
         print("🧠 Loading Equipment Catalog from Airtable Brain...")
         
         try:
-            all_records = self.table.all()
+            records = []
+            key_pairs = []
             
-            # Build cache indexed by multiple keys for flexible lookup
-            for record in all_records:
-                fields = record.get('fields', {})
-                
-                # Extract product identifiers
-                model = fields.get('Model', '').strip().lower()
-                model_number = fields.get('Model Number', '').strip().lower()
-                part_number = fields.get('Part Number', '').strip().lower()
-                name = fields.get('Name', '').strip().lower()
-                brand = fields.get('Brand', '').strip().lower()
-                
-                # Extract specs - support multiple field name variations
-                height_u = self._get_height_u(fields)
-                watts = self._get_watts(fields)
-                btu = self._get_btu(fields, watts)
-                weight = self._get_weight(fields)
-                subsystem = self._get_subsystem(fields)
-                
-                product_data = {
-                    'record_id': record.get('id'),
-                    'name': fields.get('Name', ''),
-                    'brand': fields.get('Brand', ''),
-                    'model': fields.get('Model', '') or fields.get('Model Number', ''),
-                    'part_number': fields.get('Part Number', ''),
-                    'rack_units': height_u,
-                    'height_u': height_u,
-                    'watts': watts,
-                    'btu': btu,
-                    'weight': weight,
-                    'subsystem': subsystem,  # 'AV' or 'Network' or 'Power' etc.
-                    'is_rack_mountable': height_u is not None and height_u > 0,
-                    'category': fields.get('Category', '') or fields.get('Type', ''),
-                    'connections': fields.get('Connections', {}),
-                    'front_image': self._get_image_url(fields.get('Front Image')),
-                    'source': 'airtable'
-                }
-                
-                # Index by multiple keys for flexible lookup
-                for key in [model, model_number, part_number, name]:
-                    if key:
-                        self._product_cache[key] = product_data
-                
-                # Also index by brand + model
-                if brand and model:
-                    self._product_cache[f"{brand} {model}"] = product_data
+            # Parse records page by page, then index them all in one bulk insert
+            for record in self._iterate_records():
+                records.append(record)
+                key_pairs.extend(self._add_record(record))
             
+            self._install_lookup_keys(key_pairs)
             self._cache_loaded = True
-            print(f"✅ Loaded {len(all_records)} products from Brain")
+            print(f"✅ Loaded {len(records)} products from Brain")
             
         except Exception as e:
             print(f"❌ Error loading from Airtable: {e}")
             raise
+        
+        self._write_disk_cache(records)
+    
+    def _add_record(self, record: Dict) -> List[Tuple[str, str]]:
+        """
+        Add one Airtable record to the catalog.
+        
+        Returns (lookup key, record id) pairs for _install_lookup_keys.
+        """
+        product_data, keys = self._parse_record(record)
+        self._products_by_id[product_data.record_id] = product_data
+        
+        # Interned so the cache, the indexes and repeated queries share one object
+        return [(sys.intern(key), product_data.record_id) for key in keys]
+    
+    def _parse_record(self, record: Dict) -> Tuple[CatalogProduct, List[str]]:
+        """Convert one Airtable record into a CatalogProduct and its lookup keys"""
+        fields = record.get('fields', {})
+        # Airtable leaves empty cells out of the record entirely
+        get = fields.get
+        raw_name = get('Name', '')
+        raw_brand = get('Brand', '')
+        raw_model = get('Model', '')
+        raw_model_number = get('Model Number', '')
+        raw_part_number = get('Part Number', '')
+        category = get('Category', '')
+        type_ = get('Type', '')
+        connections = get('Connections')
+        front_image = get('Front Image')
+        
+        # Extract product identifiers
+        model = raw_model.strip().casefold()
+        model_number = raw_model_number.strip().casefold()
+        part_number = raw_part_number.strip().casefold()
+        name = raw_name.strip().casefold()
+        brand = raw_brand.strip().casefold()
+        
+        # Extract specs - support multiple field name variations
+        spec_values = self._collect_spec_values(fields)
+        height_u = self._get_height_u(spec_values.get('height_u', []))
+        watts = self._get_watts(spec_values.get('watts', []))
+        btu = self._get_btu(spec_values.get('btu', []), watts)
+        weight = self._get_weight(spec_values.get('weight', []))
+        subsystem = self._get_subsystem(spec_values.get('subsystem', []))
+        
+        product_data = CatalogProduct(
+            record_id=record['id'],
+            name=raw_name,
+            brand=raw_brand,
+            model=raw_model or raw_model_number,
+            part_number=raw_part_number,
+            rack_units=height_u,
+            height_u=height_u,
+            watts=watts,
+            btu=btu,
+            weight=weight,
+            subsystem=subsystem,
+            is_rack_mountable=height_u is not None and height_u > 0,
+            category=category or type_,
+            connections=connections if connections is not None else {},
+            front_image=self._get_image_url(front_image),
+        )
+        
+        # Index by multiple keys for flexible lookup, plus brand + model
+        keys = [model, model_number, part_number, name]
+        if brand and model:
+            keys.append(f"{brand} {model}")
+        
+        return product_data, [key for key in keys if key]
+    
+    def _read_disk_cache(self) -> Optional[List[Dict]]:
+        """
+        Return the raw records saved by a previous run, or None if the cache
+        file is missing, unreadable, expired, or was written for a different
+        base/table.
+        """
+        if CACHE_TTL <= 0 or not CACHE_FILE.exists():
+            return None
+        
+        try:
+            with open(CACHE_FILE, 'r') as f:
+                cached = json.load(f)
+        except (ValueError, IOError):  # Bad JSON or encoding, or unreadable
+            return None
+        
+        if not isinstance(cached, dict):
+            return None
+        if cached.get('base_id') != self.base_id or cached.get('table_name') != self.table_name:
+            return None
+        fetched_at = cached.get('fetched_at')
+        if not isinstance(fetched_at, (int, float)) or time.time() - fetched_at >= CACHE_TTL:
+            return None
+        
+        records = cached.get('records')
+        return records if isinstance(records, list) else None
+    
+    def _write_disk_cache(self, records: List[Dict]) -> None:
+        """Save raw records to disk (write to a temp file, then atomically replace)"""
+        if CACHE_TTL <= 0:
+            return
+        
+        cached = {
+            'fetched_at': time.time(),
+            'base_id': self.base_id,
+            'table_name': self.table_name,
+            'records': records,
+        }
+        tmp_path = CACHE_FILE.with_name(f"{CACHE_FILE.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(cached, f)
+            os.replace(tmp_path, CACHE_FILE)
+        except IOError as e:
+            print(f"⚠️  Could not save catalog cache: {e}")
+    
+    def invalidate(self) -> None:
+        """Drop the in-memory and on-disk catalog cache so the next lookup refetches"""
+        with self._load_lock:
+            try:
+                CACHE_FILE.unlink()
+            except FileNotFoundError:
+                pass
+            
+            self._cache_loaded = False
+            self._products_by_id = {}
+            self._alias_to_id = {}
+            self._prefix_index = {}
+            self._ngram_index = {}
+            self._fuzzy_memo = OrderedDict()
+            self._miss_cache = set()
+            self._miss_order = deque()
     
-    def _get_height_u(self, fields: dict) -> Optional[int]:
-        """Extract Height (U) from various possible field names"""
-        for field_name in ['Height (U)', 'Rack Units', 'RU', 'U Height', 'Height', 'Size (U)']:
-            value = fields.get(field_name)
+    def _iterate_records(self, **options):
+        """
+        Yield catalog records one page at a time, requesting only the
+        CATALOG_FIELDS the table has. Extra options (e.g. formula) are passed
+        through to table.iterate().
+        """
+        fields = self._catalog_projection()
+        if fields is not None:
+            options['fields'] = fields
+        
+        for page in self.table.iterate(page_size=PAGE_SIZE, **options):
+            yield from page
+    
+    def _catalog_projection(self) -> Optional[List[str]]:
+        """
+        CATALOG_FIELDS that exist in the table, or None to fetch every field.
+        
+        The table schema is fetched once. Without access to it (the token
+        lacks schema.bases:read) records are fetched with all their fields.
+        """
+        if not self._projection_checked:
+            try:
+                existing = {schema_field.name for schema_field in self.table.schema().fields}
+                self._projection = [name for name in CATALOG_FIELDS if name in existing]
+            except HTTPError as e:
+                print(f"⚠️  Could not read the table schema, fetching all fields: {e}")
+            self._projection_checked = True
+        
+        return self._projection
+    
+    def _install_lookup_keys(self, key_pairs: List[Tuple[str, str]]) -> None:
+        """Bulk-insert lookup keys into the alias index, then build the fuzzy-match indexes"""
+        # Later records win on duplicate keys, as with one-at-a-time inserts
+        self._alias_to_id.update(key_pairs)
+        
+        for key in self._alias_to_id:
+            self._prefix_index.setdefault(key[:FUZZY_PREFIX_LEN], []).append(key)
+            for gram in {key[i:i + FUZZY_NGRAM_LEN] for i in range(len(key) - FUZZY_NGRAM_LEN + 1)}:
+                self._ngram_index.setdefault(gram, []).append(key)
+    
+    def _fuzzy_lookup(self, search_key: str) -> Optional[CatalogProduct]:
+        """
+        Find a cached product whose key contains, or is contained in, the search key.
+        
+        Uses the prefix and n-gram indexes so only a small bucket of candidate
+        keys is substring-checked instead of the whole cache.
+        """
+        # Keys sharing the same prefix (the common "model + suffix" case)
+        for cached_key in self._prefix_index.get(search_key[:FUZZY_PREFIX_LEN], ()):
+            if search_key in cached_key or cached_key in search_key:
+                return self._products_by_id[self._alias_to_id[cached_key]]
+        
+        # Keys containing the search key: every one of them is listed under
+        # each n-gram of the search key, so scan the shortest posting list
+        if len(search_key) >= FUZZY_NGRAM_LEN:
+            grams = {search_key[i:i + FUZZY_NGRAM_LEN] for i in range(len(search_key) - FUZZY_NGRAM_LEN + 1)}
+            postings = [self._ngram_index.get(gram, []) for gram in grams]
+            for cached_key in min(postings, key=len):
+                if search_key in cached_key:
+                    return self._products_by_id[self._alias_to_id[cached_key]]
+        else:
+            # Too short for the n-gram index - fall back to a full scan
+            for cached_key, record_id in self._alias_to_id.items():
+                if search_key in cached_key:
+                    return self._products_by_id[record_id]
+        
+        # Keys contained in the search key: probe its substrings, longest first
+        for length in range(len(search_key) - 1, 0, -1):
+            for start in range(len(search_key) - length + 1):
+                record_id = self._alias_to_id.get(search_key[start:start + length])
+                if record_id is not None:
+                    return self._products_by_id[record_id]
+        
+        return None
+    
+    def _collect_spec_values(self, fields: dict) -> Dict[str, List[Any]]:
+        """
+        Group a record's values by spec in a single pass over its fields.
+        
+        Returns spec -> candidate values, ordered by SPEC_FIELD_ALIASES priority.
+        """
+        return {
+            spec: [fields[field_name] for field_name in field_names]
+            for spec, field_names in _spec_field_plan(tuple(fields))
+        }
+    
+    def _get_height_u(self, values: List[Any]) -> Optional[int]:
+        """Extract Height (U) from the first usable candidate value"""
+        for value in values:
             if value is not None:
                 try:
                     return int(float(value))
@@ -128,10 +476,9 @@ class AirtableBrain:
                     continue
         return None
     
-    def _get_watts(self, fields: dict) -> Optional[float]:
-        """Extract Watts from various possible field names"""
-        for field_name in ['Watts', 'Power (W)', 'Power', 'Wattage', 'Power Consumption']:
-            value = fields.get(field_name)
+    def _get_watts(self, values: List[Any]) -> Optional[float]:
+        """Extract Watts from the first usable candidate value"""
+        for value in values:
             if value is not None:
                 try:
                     return float(value)
@@ -139,10 +486,9 @@ class AirtableBrain:
                     continue
         return None
     
-    def _get_btu(self, fields: dict, watts: Optional[float] = None) -> Optional[float]:
+    def _get_btu(self, values: List[Any], watts: Optional[float] = None) -> Optional[float]:
         """Extract BTU or calculate from Watts"""
-        for field_name in ['BTU', 'BTU/hr', 'Heat Output', 'Thermal']:
-            value = fields.get(field_name)
+        for value in values:
             if value is not None:
                 try:
                     return float(value)
@@ -155,10 +501,9 @@ class AirtableBrain:
         
         return None
     
-    def _get_weight(self, fields: dict) -> Optional[float]:
-        """Extract Weight from various possible field names"""
-        for field_name in ['Weight', 'Weight (lbs)', 'Weight (lb)', 'Mass']:
-            value = fields.get(field_name)
+    def _get_weight(self, values: List[Any]) -> Optional[float]:
+        """Extract Weight from the first usable candidate value"""
+        for value in values:
             if value is not None:
                 try:
                     return float(value)
@@ -166,26 +511,25 @@ class AirtableBrain:
                     continue
         return None
     
-    def _get_subsystem(self, fields: dict) -> str:
+    def _get_subsystem(self, values: List[Any]) -> str:
         """
-        Extract Subsystem (AV vs Network) from various possible field names.
+        Extract Subsystem (AV vs Network) from the first non-empty candidate value.
         Returns 'AV', 'Network', or '' if not specified.
         """
-        for field_name in ['Subsystem', 'System', 'Category', 'Type', 'Department']:
-            value = fields.get(field_name)
+        for value in values:
             if value:
-                value_lower = str(value).lower()
+                value = str(value)
                 
                 # Network keywords
-                if any(kw in value_lower for kw in ['network', 'net', 'switch', 'router', 'wifi', 'lan']):
+                if NETWORK_SUBSYSTEM_RE.search(value):
                     return 'Network'
                 
                 # AV keywords
-                if any(kw in value_lower for kw in ['av', 'audio', 'video', 'control', 'lighting', 'savant', 'lutron']):
+                if AV_SUBSYSTEM_RE.search(value):
                     return 'AV'
                 
                 # Return the raw value if no match
-                return str(value)
+                return value
         
         return ''
     
@@ -197,7 +541,7 @@ class AirtableBrain:
             return attachments[0].get('url')
         return None
     
-    def lookup_by_model(self, model_number: str) -> Optional[Dict]:
+    def lookup_by_model(self, model_number: str) -> Optional[CatalogProduct]:
         """
         Look up a product by Model Number from the Brain.
         
@@ -205,23 +549,137 @@ class AirtableBrain:
             model_number: The model/part number to search for
             
         Returns:
-            Product data dict or None if not found
+            CatalogProduct or None if not found
         """
         self._load_all_products()
         
-        # Clean up the search term
-        search_key = model_number.strip().lower()
+        # Clean up the search term (interned to match the cache keys by identity)
+        search_key = sys.intern(model_number.strip().casefold())
         
         # Direct lookup
-        if search_key in self._product_cache:
-            return self._product_cache[search_key]
+        record_id = self._alias_to_id.get(search_key)
+        if record_id is not None:
+            return self._products_by_id[record_id]
         
-        # Fuzzy match - check if model is contained in any cached key
-        for cached_key, data in self._product_cache.items():
-            if search_key in cached_key or cached_key in search_key:
-                return data
+        # Recently resolved fuzzy match
+        result = self._fuzzy_memo.get(search_key)
+        if result is not None:
+            try:
+                self._fuzzy_memo.move_to_end(search_key)
+            except KeyError:
+                pass  # Evicted by another thread in the meantime
+            return result
         
-        return None
+        # Already known to match nothing
+        if search_key in self._miss_cache:
+            return None
+        
+        # Fuzzy match - check if model is contained in any cached key (or vice versa)
+        result = self._fuzzy_lookup(search_key)
+        if result is not None:
+            self._fuzzy_memo[search_key] = result
+            if len(self._fuzzy_memo) > LOOKUP_CACHE_SIZE:
+                self._fuzzy_memo.popitem(last=False)
+        else:
+            self._remember_miss(search_key)
+        
+        return result
+    
+    def lookup_by_models(self, model_numbers: List[str]) -> Dict[str, Optional[CatalogProduct]]:
+        """
+        Look up several products at once.
+        
+        Once the catalog is loaded this is lookup_by_model for each entry.
+        Before that, only the requested products are fetched - exact
+        (case-insensitive) matches on LOOKUP_MATCH_FIELDS, batched by
+        LOOKUP_BATCH_SIZE and MAX_FORMULA_LENGTH - instead of downloading
+        the whole catalog. If the catalog is already being loaded (e.g. by
+        warm_cache), this waits for it rather than querying alongside it.
+        
+        Returns:
+            Dict mapping each model number to its CatalogProduct or None
+        """
+        if not self._cache_loaded and not self._load_lock.locked():
+            try:
+                return self._fetch_models(model_numbers)
+            except HTTPError as e:
+                if e.response is None or e.response.status_code != 422:
+                    raise
+                print("⚠️  Catalog is missing a lookup field, loading the full catalog instead")
+        
+        return {model_number: self.lookup_by_model(model_number) for model_number in model_numbers}
+    
+    def _fetch_models(self, model_numbers: List[str]) -> Dict[str, Optional[CatalogProduct]]:
+        """
+        Fetch just the records matching the given model numbers.
+        
+        Airtable's LOWER() doesn't casefold (e.g. "ß" vs "ss"), so only the
+        local casefolded index matches non-ASCII model numbers reliably. If
+        there are any, the catalog is loaded once and every model number is
+        answered from it, without filtered queries.
+        """
+        results: Dict[str, Optional[CatalogProduct]] = dict.fromkeys(model_numbers)
+        
+        # Normalized query -> original model numbers asking for it
+        wanted: Dict[str, List[str]] = {}
+        for model_number in model_numbers:
+            search_key = model_number.strip().casefold()
+            if not search_key:
+                continue
+            if not model_number.isascii():
+                return {model_number: self.lookup_by_model(model_number) for model_number in model_numbers}
+            wanted.setdefault(search_key, []).append(model_number)
+        
+        # ASCII keys: casefold(), lower() and Airtable's LOWER() all agree
+        for formula in self._match_formulas(list(wanted)):
+            for record in self._iterate_records(formula=formula):
+                product, keys = self._parse_record(record)
+                for key in keys:
+                    for model_number in wanted.get(key, ()):
+                        if results[model_number] is None:
+                            results[model_number] = product
+        
+        return results
+    
+    @staticmethod
+    def _match_formulas(search_keys: List[str]):
+        """
+        Yield Airtable formulas matching any search key in any LOOKUP_MATCH_FIELDS field.
+        
+        Each formula holds at most LOOKUP_BATCH_SIZE keys and stays under
+        MAX_FORMULA_LENGTH once URL-encoded (a single oversized key still
+        gets a formula of its own).
+        """
+        wrapper_length = len(quote("OR()", safe=''))
+        separator_length = len(quote(",", safe=''))
+        batch: List[str] = []
+        length = wrapper_length
+        
+        for search_key in search_keys:
+            quoted = "'" + search_key.replace("\\", "\\\\").replace("'", "\\'") + "'"
+            clause = ",".join(f"LOWER(TRIM({{{field_name}}}))={quoted}" for field_name in LOOKUP_MATCH_FIELDS)
+            clause_length = len(quote(clause, safe='')) + separator_length
+            
+            if batch and (len(batch) >= LOOKUP_BATCH_SIZE or length + clause_length > MAX_FORMULA_LENGTH):
+                yield "OR(" + ",".join(batch) + ")"
+                batch = []
+                length = wrapper_length
+            
+            batch.append(clause)
+            length += clause_length
+        
+        if batch:
+            yield "OR(" + ",".join(batch) + ")"
+    
+    def _remember_miss(self, search_key: str) -> None:
+        """Record a query that matched nothing, dropping the oldest past MISS_CACHE_SIZE"""
+        if MISS_CACHE_SIZE <= 0 or search_key in self._miss_cache:
+            return
+        
+        self._miss_cache.add(search_key)
+        self._miss_order.append(search_key)
+        while len(self._miss_order) > MISS_CACHE_SIZE:
+            self._miss_cache.discard(self._miss_order.popleft())
     
     def get_rack_specs(self, model_number: str) -> Optional[Dict]:
         """
@@ -237,49 +695,50 @@ class AirtableBrain:
             return None
         
         # Must have rack units to be included
-        if not product.get('rack_units') or product.get('rack_units', 0) == 0:
+        if not product.rack_units:
             return None
         
         return {
-            'rack_units': product.get('rack_units', 1),
-            'height_u': product.get('height_u', 1),
-            'weight': product.get('weight', 10.0),
-            'watts': product.get('watts', 0),
-            'btu': product.get('btu', 0),
-            'subsystem': product.get('subsystem', ''),
+            'rack_units': product.rack_units,
+            'height_u': product.height_u,
+            'weight': product.weight,
+            'watts': product.watts,
+            'btu': product.btu,
+            'subsystem': product.subsystem,
             'is_rack_mountable': True,
-            'brand': product.get('brand', ''),
-            'model': product.get('model', ''),
-            'connections': product.get('connections', {}),
+            'brand': product.brand,
+            'model': product.model,
+            'connections': product.connections,
             'source': 'airtable'
         }
     
-    def get_all_products(self) -> List[Dict]:
+    def get_all_products(self) -> List[CatalogProduct]:
         """Get all products from the catalog"""
         self._load_all_products()
-        
-        # Return unique products (deduplicated by record_id)
-        seen_ids = set()
-        unique_products = []
-        
-        for product in self._product_cache.values():
-            record_id = product.get('record_id')
-            if record_id and record_id not in seen_ids:
-                seen_ids.add(record_id)
-                unique_products.append(product)
-        
-        return unique_products
+        return list(self._products_by_id.values())
 
 
 # Singleton instance
 _brain: Optional[AirtableBrain] = None
+_brain_lock = threading.Lock()
 
 
-def get_airtable_client() -> AirtableBrain:
-    """Get or create the Airtable Brain singleton"""
+def get_airtable_client(warm: bool = False) -> AirtableBrain:
+    """
+    Get or create the Airtable Brain singleton (thread-safe).
+    
+    With warm=True, creating it also starts downloading the whole catalog in
+    the background. Leave it off for callers that only use lookup_by_models,
+    which fetches just the requested products.
+    """
     global _brain
     if _brain is None:
-        _brain = AirtableBrain()
+        with _brain_lock:
+            if _brain is None:
+                brain = AirtableBrain()
+                if warm:
+                    threading.Thread(target=brain.warm_cache, daemon=True).start()
+                _brain = brain
     return _brain
 
 
@@ -302,8 +761,8 @@ if __name__ == "__main__":
         
         # Show first 10 products with specs
         for p in products[:10]:
-            print(f"  • {p.get('brand', 'N/A')} {p.get('model', 'N/A')}")
-            print(f"    Height: {p.get('rack_units', 'N/A')}U | Watts: {p.get('watts', 'N/A')}W | Subsystem: {p.get('subsystem', 'N/A')}")
+            print(f"  • {p.brand} {p.model}")
+            print(f"    Height: {p.rack_units}U | Watts: {p.watts}W | Subsystem: {p.subsystem}")
             print()
         
         if len(products) > 10:
@@ -6,14 +6,16 @@ Upload a CSV and get professional rack elevations and block diagrams
 
 import streamlit as st
 import tempfile
+import math
 import os
+import re
 from pathlib import Path
 from datetime import datetime
 import base64
 
 # Import our modules
-from csv_parser import parse_client_csv, get_unique_products_with_quantities, get_rack_info_from_csv
-from rack_arranger import arrange_rack, expand_quantities, print_rack_layout
+from csv_parser import read_csv_rows, products_from_rows, get_unique_products_with_quantities, get_rack_info_from_csv
+from rack_arranger import RackItem, RackItemType, arrange_rack, expand_quantities, print_rack_layout
 from pdf_generator import generate_rack_pdf
 
 # Try to import database client
@@ -93,17 +95,32 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+def _keywords_re(keywords) -> re.Pattern:
+    """One regex alternation matching any of the keywords, so a field is scanned once"""
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+
+# Network equipment by brand, or by model/name keywords
+NETWORK_BRAND_RE = _keywords_re(['ubiquiti', 'pakedge', 'araknis', 'cisco', 'netgear', 'access networks'])
+NETWORK_MODEL_RE = _keywords_re(['usw-', 'udm-', 'uap-', 'an-', 'ss42', 'switch', 'router', 'gateway'])
+
+# Pre-filter: brands always kept, and name/category keywords of non-rack items
+KEEP_BRAND_RE = _keywords_re(['araknis', 'ubiquiti', 'cisco', 'netgear', 'pakedge', 'access networks', 'motu'])
+SKIP_KEYWORD_RE = _keywords_re([
+    'pre-wire', 'prewire', 'cable', 'wire ', 'in-wall', 'in-ceiling',
+    'outdoor speaker', 'screen', 'projector mount', 'tv mount',
+    'wallplate', 'wall plate', 'keypad', 'dimmer', 'sensor',
+    'back box', 'backbox', 'allowance', 'labor', 'installation',
+])
+
+
 def split_into_av_and_network(rack_items):
     """Split rack items into AV and Network categories"""
     av_items = []
     network_items = []
     
-    network_brands = ['ubiquiti', 'pakedge', 'araknis', 'cisco', 'netgear', 'access networks']
-    network_models = ['usw-', 'udm-', 'uap-', 'an-', 'ss42', 'switch', 'router', 'gateway']
-    
     for item in rack_items:
-        subsystem = getattr(item, 'subsystem', None) or ''
-        subsystem_lower = subsystem.lower() if subsystem else ''
+        subsystem_lower = item.subsystem.lower()
         
         if 'network' in subsystem_lower or 'net' in subsystem_lower:
             network_items.append(item)
@@ -116,10 +133,10 @@ def split_into_av_and_network(rack_items):
         model_lower = item.model.lower() if item.model else ""
         name_lower = item.name.lower() if item.name else ""
         
-        is_network = (
-            any(nb in brand_lower for nb in network_brands) or
-            any(nm in model_lower for nm in network_models) or
-            any(nm in name_lower for nm in network_models)
+        is_network = bool(
+            NETWORK_BRAND_RE.search(brand_lower) or
+            NETWORK_MODEL_RE.search(model_lower) or
+            NETWORK_MODEL_RE.search(name_lower)
         )
         
         if is_network:
@@ -132,9 +149,6 @@ def split_into_av_and_network(rack_items):
 
 def enrich_products_with_specs_streamlit(products, use_database=True, use_ai=True, progress_callback=None):
     """Get product specifications - Streamlit version with progress updates"""
-    from rack_arranger import RackItem, RackItemType
-    import math
-    
     rack_items = []
     specs_lookup = {}
     products_needing_ai = []
@@ -143,40 +157,34 @@ def enrich_products_with_specs_streamlit(products, use_database=True, use_ai=Tru
     def is_clearly_not_rack_mountable(product):
         if not product.model and not product.part_number:
             return True
-        name = (product.name or '').lower()
-        category = (product.category or '').lower()
-        brand = (product.brand or '').lower()
+        name = product.name_lc
+        category = product.category_lc
+        brand = product.brand_lc
         
-        network_brands = ['araknis', 'ubiquiti', 'cisco', 'netgear', 'pakedge', 'access networks', 'motu']
-        if any(nb in brand for nb in network_brands):
+        if KEEP_BRAND_RE.search(brand):
             return False
         if 'networking' in category or 'switches' in category:
             return False
         
-        skip_keywords = [
-            'pre-wire', 'prewire', 'cable', 'wire ', 'in-wall', 'in-ceiling',
-            'outdoor speaker', 'screen', 'projector mount', 'tv mount',
-            'wallplate', 'wall plate', 'keypad', 'dimmer', 'sensor',
-            'back box', 'backbox', 'allowance', 'labor', 'installation',
-        ]
-        combined_text = f"{name} {category}"
-        return any(kw in combined_text for kw in skip_keywords)
+        return SKIP_KEYWORD_RE.search(f"{name} {category}") is not None
     
     filtered_products = [p for p in products if not is_clearly_not_rack_mountable(p)]
     
     if progress_callback:
         progress_callback(f"📦 {len(filtered_products)} products after filtering")
     
+    # Spec lookup key of each product, computed once for every step
+    lookup_keys = [f"{p.brand} {p.model}".strip().lower() for p in filtered_products]
+    
     # Database lookup
     if use_database and DATABASE_AVAILABLE:
         try:
             db = get_database()
-            for product in filtered_products:
+            for product, lookup_key in zip(filtered_products, lookup_keys):
                 model_num = product.part_number or product.model
                 db_specs = db.get_rack_specs(model_num)
                 
                 if db_specs:
-                    lookup_key = f"{product.brand} {product.model}".strip().lower()
                     specs_lookup[lookup_key] = db_specs
                 else:
                     products_needing_ai.append(product)
@@ -209,15 +217,15 @@ def enrich_products_with_specs_streamlit(products, use_database=True, use_ai=Tru
                 progress_callback(f"⚠️ AI lookup failed: {e}")
     
     # Build rack items
-    for product in filtered_products:
-        lookup_key = f"{product.brand} {product.model}".strip().lower()
+    for product, lookup_key in zip(filtered_products, lookup_keys):
         specs = specs_lookup.get(lookup_key, {})
         
         if specs:
             if not specs.get('is_rack_mountable', True):
                 continue
             
-            rack_units = math.ceil(specs.get('rack_units', 0)) if specs.get('rack_units', 0) > 0 else 0
+            rack_units_raw = specs.get('rack_units', 0)
+            rack_units = math.ceil(rack_units_raw) if rack_units_raw > 0 else 0
             if rack_units == 0:
                 continue
             
@@ -231,7 +239,7 @@ def enrich_products_with_specs_streamlit(products, use_database=True, use_ai=Tru
                 btu=specs.get('btu', 0) or product.calculated_btu or 0,
                 connections=specs.get('connections'),
                 quantity=product.quantity,
-                subsystem=specs.get('subsystem', '')
+                subsystem=specs.get('subsystem') or ''
             )
             rack_items.append(rack_item)
     
@@ -577,9 +585,10 @@ def generate_documents(csv_path, project_name, company_name, config,
     progress = st.progress(0, text="Starting...")
     
     try:
-        # Parse CSV
+        # Parse CSV (rows are reused for the block diagram)
         progress.progress(10, text="📄 Parsing CSV...")
-        products = parse_client_csv(csv_path)
+        headers, rows = read_csv_rows(csv_path)
+        products = products_from_rows(headers, rows)
         products = get_unique_products_with_quantities(products)
         
         if not products:
@@ -672,7 +681,8 @@ def generate_documents(csv_path, project_name, company_name, config,
                     output_path=block_pdf_path,
                     project_name=project_name,
                     intent=intent,
-                    page_size=page_size
+                    page_size=page_size,
+                    rows=rows
                 )
                 
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -5,11 +5,13 @@ Creates high-level system architecture diagrams from System Intent + Equipment C
 """
 
 import csv
+import math
 import re
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Optional
-from collections import defaultdict
+from collections import Counter
+from functools import lru_cache
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import landscape, TABLOID
@@ -36,6 +38,18 @@ SYSTEM_COLORS = {
     'other': colors.HexColor('#95A5A6'),        # Gray
 }
 
+# Diagram chrome colors (parsed once, not per block)
+DIAGRAM_COLORS = {
+    'block_bg': colors.HexColor('#FFFFFF'),         # System block background
+    'head_end_bg': colors.HexColor('#ECF0F1'),      # Head-end container
+    'head_end': colors.HexColor('#2C3E50'),         # Head-end border + title bar
+    'room_bg': colors.HexColor('#FDF2E9'),          # Room container
+    'idf_room_bg': colors.HexColor('#E8F4F8'),      # Room container with IDF switch
+    'room': colors.HexColor('#566573'),             # Room border, title bar + arrows
+    'backbone': SYSTEM_COLORS['network'],           # Network backbone + IDF label
+    'footer': colors.HexColor('#7F8C8D'),           # Footer text
+}
+
 SYSTEM_LABELS = {
     'video': 'VIDEO',
     'video_rx': 'VIDEO RX',
@@ -49,6 +63,122 @@ SYSTEM_LABELS = {
     'other': 'OTHER',
 }
 
+# Legend rows (color, label) - the first 8 systems
+LEGEND_ENTRIES = tuple(
+    (color, SYSTEM_LABELS.get(system, system))
+    for system, color in list(SYSTEM_COLORS.items())[:8]
+)
+
+# Keywords in the (lower-cased) System field, checked in order - first match wins
+SYSTEM_FIELD_KEYWORDS = (
+    ('video', ('video',)),
+    ('audio', ('audio',)),
+    ('network', ('network', 'wifi')),
+    ('control', ('control', 'automation')),
+    ('lighting', ('lighting',)),
+    ('hvac', ('hvac', 'climate')),
+    ('power', ('power', 'rack')),
+    ('security', ('cctv', 'security', 'access')),
+)
+
+# Part number fragments, checked in order when the System field doesn't decide
+# Note: PS65, PS80, UB32, WB80 are IP Video Receivers - categorize separately
+PART_NUMBER_KEYWORDS = (
+    ('video_rx', ('PS65', 'PS80', 'UB32', 'WB80')),
+    ('video', ('QN', 'HDMI', 'VIDEO')),
+    ('audio', ('PAV-SI', 'AMP', 'SPEAKER', 'IS8', 'SPL5', 'BIJOU', 'AOM')),
+    ('network', ('USW', 'UDM', 'E7', 'AP', 'SWITCH')),
+    ('control', ('SSC', 'PKG-MAC', 'HOST', 'REM-')),
+    ('lighting', ('HQP', 'LUTRON', 'HW-NW')),
+    ('hvac', ('CLI-', 'THERM')),
+    ('power', ('WB-', 'UPS', 'PDU', 'OVRC')),
+)
+
+
+def _category_res(table):
+    """Compile each category's keywords into one substring regex"""
+    return tuple(
+        (category, re.compile('|'.join(map(re.escape, keywords))))
+        for category, keywords in table
+    )
+
+
+SYSTEM_FIELD_RES = _category_res(SYSTEM_FIELD_KEYWORDS)
+PART_NUMBER_RES = _category_res(PART_NUMBER_KEYWORDS)
+
+# Part number fragments that mark non-equipment items (connectors, wire, brackets, labor)
+SKIP_PART_PATTERNS = (
+    'CONN-', 'WP-', 'PLATE:', '~PWR', 'DATA-', 'AUDIO-', 'VIDEO-',
+    'BRKT:', 'CAT6', 'CAT5', 'RG6', '14/2', '14/4', '16/2', 'LUTRON-GRN',
+    'DEVICE -', 'CONTROL -', 'NETWORK ', 'AMP-', 'IP ', 'UI -',
+    'SPEAKER SYSTEM', 'CABLE MODEM', 'SPACESAVER', '-ENCL-', 'EBB-',
+    '~RCS', '~AXS', 'BR1', 'UACC-', 'PDW-', 'RM-', '~LCB', '~SVR',
+    'RCK-', 'SSL-', 'OVX001', 'IS-ENCL', 'BRK.', 'BLUEBERRY',
+    'LQSE-', 'PD10', 'PD8', 'HQR-', 'QSPS-', 'QS-WLB', 'IR EMITTER',
+    'EQUIPMENT RACK', 'SA-20', 'SENSOR',
+)
+SKIP_PART_RE = re.compile('|'.join(map(re.escape, SKIP_PART_PATTERNS)))
+
+# Exact match placeholders to skip (these are labor/programming items, not actual equipment)
+PLACEHOLDER_PARTS = frozenset({
+    'TV', 'NETWORK WAP', 'NETWORK SWITCH-MANAGED', 'NETWORK ROUTER [ADVANCED]',
+    'IP SMART POWER', 'IP DEVICE', 'INTERFACE - PROCESSOR-LIGHTING',
+    'CONTROL - LIGHTING KEYPAD', 'UI - REMOTE - HANDHELD',
+    'DEVICE - PROCESSOR-CONTROL', 'DEVICE - MATRIX SWITCHER',
+    'DEVICE - IP AV [TX/RX]', 'DEVICE - HOST [5xxx]', 'DEVICE - IP',
+    'AMP-MULTI', 'SPEAKER - IN-CEILING',
+})
+
+# Location path terms that mark the head-end (rack) location
+HEAD_END_TERMS = ('equipment', 'closet', 'rack', 'mdf')
+HEAD_END_RE = re.compile('|'.join(HEAD_END_TERMS))
+
+# "101 - Living Room" -> room number + room name
+ROOM_NUMBER_RE = re.compile(r'(\d+)\s*-\s*(.+)')
+
+# Friendly display names, matched as substrings of the part number (first match wins)
+DISPLAY_NAMES = {
+    'PKG-MACUNLIMITED': 'Savant Host',
+    'SSC-0012': 'Controller',
+    'PAV-SIPA125SM-10': 'Amp 125W',
+    'PAV-AOMBAL8C-10': 'Audio Balun',
+    'UDM-PRO-MAX': 'Router',
+    'USW-PRO-XG-AGGREGATION': 'Aggregation SW',
+    'USW-PRO-XG-24-POE': '24-Port PoE SW',
+    'USW-PRO-XG-8-POE': '8-Port PoE SW',
+    'E7 CAMPUS': 'Outdoor WiFi AP',
+    'E7': 'WiFi AP',
+    'HQP7-2': 'Lutron Processor',
+    'CLI-8000': 'HVAC Controller',
+    'CLI-THFM1': 'Thermostat',
+    'WB-OVRC-OLUPS-1500-1': 'UPS',
+    'WB-800VPS-IPVM-18': 'PDU',
+    'WB-300VB-IP-5': 'Surge Protector',
+    'OVRC-300-PRO': 'OvrC Hub',
+    'QN65QN90FAFXZA': '65" Samsung TV',
+    'QN85QN90FAFXZA': '85" Samsung TV',
+    'QN65LS01BAFXZA': '65" Frame TV',
+    'PS65': 'IP Video Rx',
+    'PS80': 'IP Video Rx',
+    'UB32': 'Video Wall Box',
+    'WB80': 'Video Wall Box',
+    'IS8': 'IS8 Ceiling Spk',
+    'SPL5QT-LCR': 'LCR Soundbar',
+    'BIJOU 3100': 'Bijou Amp',
+    'RZ210BK': 'Landscape Spk',
+    'OV210WT': 'Outdoor Spk',
+    'REM-4000SG-00': 'Pro Remote',
+    'PAV-AIO1C-00': 'Audio I/O',
+    'UA-HUB': 'Access Hub',
+    'UA-G3-PRO-W': 'Video Doorbell',
+    # Lutron keypads (various encoding variations)
+    'HW-NW-KP': 'Lutron Keypad',
+    'HW�NW-KP': 'Lutron Keypad',  # Handle encoding issue
+    'HW NW-KP': 'Lutron Keypad',
+    'NW-KP-S2': 'Lutron Keypad',  # Partial match for encoded variants
+    'KP-S2-E': 'Lutron Keypad',
+}
+
 
 @dataclass
 class SystemIntent:
@@ -96,7 +226,7 @@ class SystemIntent:
 class EquipmentBlock:
     """Equipment grouped by system"""
     system: str
-    items: Dict[str, int] = field(default_factory=dict)  # item_name -> count
+    items: Counter = field(default_factory=Counter)  # item_name -> count
 
 
 @dataclass
@@ -110,97 +240,31 @@ class LocationBlock:
     has_idf: bool = False
 
 
+@lru_cache(maxsize=1024)
 def categorize_part(part_number: str, system: str) -> str:
     """Determine system category from part number and system field"""
-    pn = part_number.upper()
     sys_lower = system.lower()
     
     # Check system field first
-    if 'video' in sys_lower:
-        return 'video'
-    if 'audio' in sys_lower:
-        return 'audio'
-    if 'network' in sys_lower or 'wifi' in sys_lower:
-        return 'network'
-    if 'control' in sys_lower or 'automation' in sys_lower:
-        return 'control'
-    if 'lighting' in sys_lower:
-        return 'lighting'
-    if 'hvac' in sys_lower or 'climate' in sys_lower:
-        return 'hvac'
-    if 'power' in sys_lower or 'rack' in sys_lower:
-        return 'power'
-    if 'cctv' in sys_lower or 'security' in sys_lower or 'access' in sys_lower:
-        return 'security'
+    for category, pattern in SYSTEM_FIELD_RES:
+        if pattern.search(sys_lower):
+            return category
     
     # Check part number patterns
-    # Note: PS65, PS80, UB32, WB80 are IP Video Receivers - categorize separately
-    if any(x in pn for x in ['PS65', 'PS80', 'UB32', 'WB80']):
-        return 'video_rx'  # Separate category for receivers
-    if any(x in pn for x in ['QN', 'HDMI', 'VIDEO']):
-        return 'video'
-    if any(x in pn for x in ['PAV-SI', 'AMP', 'SPEAKER', 'IS8', 'SPL5', 'BIJOU', 'AOM']):
-        return 'audio'
-    if any(x in pn for x in ['USW', 'UDM', 'E7', 'AP', 'SWITCH']):
-        return 'network'
-    if any(x in pn for x in ['SSC', 'PKG-MAC', 'HOST', 'REM-']):
-        return 'control'
-    if any(x in pn for x in ['HQP', 'LUTRON', 'HW-NW']):
-        return 'lighting'
-    if any(x in pn for x in ['CLI-', 'THERM']):
-        return 'hvac'
-    if any(x in pn for x in ['WB-', 'UPS', 'PDU', 'OVRC']):
-        return 'power'
+    pn = part_number.upper()
+    for category, pattern in PART_NUMBER_RES:
+        if pattern.search(pn):
+            return category
     
     return 'other'
 
 
+@lru_cache(maxsize=1024)
 def get_display_name(part_number: str) -> str:
     """Get a friendly display name for equipment"""
-    display_names = {
-        'PKG-MACUNLIMITED': 'Savant Host',
-        'SSC-0012': 'Controller',
-        'PAV-SIPA125SM-10': 'Amp 125W',
-        'PAV-AOMBAL8C-10': 'Audio Balun',
-        'UDM-PRO-MAX': 'Router',
-        'USW-PRO-XG-AGGREGATION': 'Aggregation SW',
-        'USW-PRO-XG-24-POE': '24-Port PoE SW',
-        'USW-PRO-XG-8-POE': '8-Port PoE SW',
-        'E7 CAMPUS': 'Outdoor WiFi AP',
-        'E7': 'WiFi AP',
-        'HQP7-2': 'Lutron Processor',
-        'CLI-8000': 'HVAC Controller',
-        'CLI-THFM1': 'Thermostat',
-        'WB-OVRC-OLUPS-1500-1': 'UPS',
-        'WB-800VPS-IPVM-18': 'PDU',
-        'WB-300VB-IP-5': 'Surge Protector',
-        'OVRC-300-PRO': 'OvrC Hub',
-        'QN65QN90FAFXZA': '65" Samsung TV',
-        'QN85QN90FAFXZA': '85" Samsung TV',
-        'QN65LS01BAFXZA': '65" Frame TV',
-        'PS65': 'IP Video Rx',
-        'PS80': 'IP Video Rx',
-        'UB32': 'Video Wall Box',
-        'WB80': 'Video Wall Box',
-        'IS8': 'IS8 Ceiling Spk',
-        'SPL5QT-LCR': 'LCR Soundbar',
-        'BIJOU 3100': 'Bijou Amp',
-        'RZ210BK': 'Landscape Spk',
-        'OV210WT': 'Outdoor Spk',
-        'REM-4000SG-00': 'Pro Remote',
-        'PAV-AIO1C-00': 'Audio I/O',
-        'UA-HUB': 'Access Hub',
-        'UA-G3-PRO-W': 'Video Doorbell',
-        # Lutron keypads (various encoding variations)
-        'HW-NW-KP': 'Lutron Keypad',
-        'HW�NW-KP': 'Lutron Keypad',  # Handle encoding issue
-        'HW NW-KP': 'Lutron Keypad',
-        'NW-KP-S2': 'Lutron Keypad',  # Partial match for encoded variants
-        'KP-S2-E': 'Lutron Keypad',
-    }
     
     # Check for exact or partial matches
-    for key, name in display_names.items():
+    for key, name in DISPLAY_NAMES.items():
         if key in part_number:
             return name
     
@@ -210,31 +274,6 @@ def get_display_name(part_number: str) -> str:
 
 def parse_equipment_csv(csv_path: str) -> Dict[str, LocationBlock]:
     """Parse equipment CSV and group by location"""
-    locations: Dict[str, LocationBlock] = {}
-    
-    # Skip patterns - includes labor placeholders and non-equipment items
-    skip_patterns = [
-        'CONN-', 'WP-', 'PLATE:', '~PWR', 'DATA-', 'AUDIO-', 'VIDEO-',
-        'BRKT:', 'CAT6', 'CAT5', 'RG6', '14/2', '14/4', '16/2', 'LUTRON-GRN',
-        'DEVICE -', 'CONTROL -', 'NETWORK ', 'AMP-', 'IP ', 'UI -',
-        'SPEAKER SYSTEM', 'CABLE MODEM', 'SPACESAVER', '-ENCL-', 'EBB-',
-        '~RCS', '~AXS', 'BR1', 'UACC-', 'PDW-', 'RM-', '~LCB', '~SVR',
-        'RCK-', 'SSL-', 'OVX001', 'IS-ENCL', 'BRK.', 'BLUEBERRY',
-        'LQSE-', 'PD10', 'PD8', 'HQR-', 'QSPS-', 'QS-WLB', 'IR EMITTER',
-        'EQUIPMENT RACK', 'SA-20', 'SENSOR',
-        # Labor placeholders (exact matches)
-    ]
-    
-    # Exact match placeholders to skip (these are labor/programming items, not actual equipment)
-    placeholder_exact = [
-        'TV', 'NETWORK WAP', 'NETWORK SWITCH-MANAGED', 'NETWORK ROUTER [ADVANCED]',
-        'IP SMART POWER', 'IP DEVICE', 'INTERFACE - PROCESSOR-LIGHTING',
-        'CONTROL - LIGHTING KEYPAD', 'UI - REMOTE - HANDHELD',
-        'DEVICE - PROCESSOR-CONTROL', 'DEVICE - MATRIX SWITCHER',
-        'DEVICE - IP AV [TX/RX]', 'DEVICE - HOST [5xxx]', 'DEVICE - IP',
-        'AMP-MULTI', 'SPEAKER - IN-CEILING',
-    ]
-    
     encodings = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252']
     content = None
     
@@ -247,11 +286,16 @@ def parse_equipment_csv(csv_path: str) -> Dict[str, LocationBlock]:
             continue
     
     if not content:
-        return locations
+        return {}
     
-    reader = csv.DictReader(content.splitlines())
+    return locations_from_rows(csv.DictReader(content.splitlines()))
+
+
+def locations_from_rows(rows: List[Dict[str, str]]) -> Dict[str, LocationBlock]:
+    """Group already-read equipment CSV rows by location (see parse_equipment_csv)"""
+    locations: Dict[str, LocationBlock] = {}
     
-    for row in reader:
+    for row in rows:
         part_number = row.get('Part Number', '').strip()
         location_path = row.get('LocationPath', '').strip()
         system = row.get('System', '').strip()
@@ -261,11 +305,11 @@ def parse_equipment_csv(csv_path: str) -> Dict[str, LocationBlock]:
             continue
         
         # Skip non-equipment items
-        if any(p in part_number for p in skip_patterns):
+        if SKIP_PART_RE.search(part_number):
             continue
         
         # Skip exact match placeholders (labor/programming items)
-        if part_number in placeholder_exact:
+        if part_number in PLACEHOLDER_PARTS:
             continue
         
         # Parse location
@@ -277,7 +321,7 @@ def parse_equipment_csv(csv_path: str) -> Dict[str, LocationBlock]:
             parts = location_path.split(':', 1)
             level = parts[0].strip()
             room_part = parts[1].strip()
-            match = re.match(r'(\d+)\s*-\s*(.+)', room_part)
+            match = ROOM_NUMBER_RE.match(room_part)
             if match:
                 room_number = match.group(1)
                 room_name = match.group(2).strip()
@@ -286,8 +330,7 @@ def parse_equipment_csv(csv_path: str) -> Dict[str, LocationBlock]:
         
         # Create location if not exists
         if location_path not in locations:
-            is_head_end = any(term in location_path.lower() 
-                           for term in ['equipment', 'closet', 'rack', 'mdf'])
+            is_head_end = HEAD_END_RE.search(location_path.lower()) is not None
             locations[location_path] = LocationBlock(
                 name=room_name,
                 level=level,
@@ -305,13 +348,12 @@ def parse_equipment_csv(csv_path: str) -> Dict[str, LocationBlock]:
         category = categorize_part(part_number, system)
         display_name = get_display_name(part_number)
         
-        if category not in loc.equipment:
-            loc.equipment[category] = EquipmentBlock(system=category)
+        block = loc.equipment.get(category)
+        if block is None:
+            block = loc.equipment[category] = EquipmentBlock(system=category)
         
         # Track count per unique item
-        if display_name not in loc.equipment[category].items:
-            loc.equipment[category].items[display_name] = 0
-        loc.equipment[category].items[display_name] += quantity
+        block.items[display_name] += quantity
     
     return locations
 
@@ -361,7 +403,7 @@ class BlockDiagramGenerator:
         label = SYSTEM_LABELS.get(system, system.upper())
         
         # Background
-        light_color = colors.HexColor('#FFFFFF')
+        light_color = DIAGRAM_COLORS['block_bg']
         self.draw_rounded_rect(c, x, y, width, height, 5, light_color, color)
         
         # Header bar
@@ -398,14 +440,14 @@ class BlockDiagramGenerator:
     def draw_head_end_block(self, c, x, y, width, height, location: LocationBlock, intent: SystemIntent):
         """Draw the main head-end equipment block"""
         # Main container
-        c.setFillColor(colors.HexColor('#ECF0F1'))
-        c.setStrokeColor(colors.HexColor('#2C3E50'))
+        c.setFillColor(DIAGRAM_COLORS['head_end_bg'])
+        c.setStrokeColor(DIAGRAM_COLORS['head_end'])
         c.setLineWidth(3)
         c.roundRect(x, y, width, height, 10, fill=1, stroke=1)
         
         # Title bar
         title_height = 30
-        c.setFillColor(colors.HexColor('#2C3E50'))
+        c.setFillColor(DIAGRAM_COLORS['head_end'])
         c.rect(x, y + height - title_height, width, title_height, fill=1, stroke=0)
         
         # Title
@@ -435,12 +477,17 @@ class BlockDiagramGenerator:
         block_width = (inner_width - (cols - 1) * 8) / cols
         block_height = min(80, (inner_height - (rows - 1) * 8) / rows)
         
+        # Grid origin and strides don't change per block
+        left_x = x + block_margin
+        top_y = y + height - title_height - 35
+        stride_x = block_width + 8
+        stride_y = block_height + 8
+        
         for i, system in enumerate(systems[:8]):  # Max 8 systems
-            col = i % cols
-            row = i // cols
+            row, col = divmod(i, cols)
             
-            bx = x + block_margin + col * (block_width + 8)
-            by = y + height - title_height - 35 - (row + 1) * (block_height + 8)
+            bx = left_x + col * stride_x
+            by = top_y - (row + 1) * stride_y
             
             block = location.equipment[system]
             self.draw_system_block(c, bx, by, block_width, block_height, 
@@ -449,15 +496,15 @@ class BlockDiagramGenerator:
     def draw_room_block(self, c, x, y, width, height, location: LocationBlock):
         """Draw a room/endpoint block"""
         # Container
-        fill_color = colors.HexColor('#FDF2E9') if not location.has_idf else colors.HexColor('#E8F4F8')
+        fill_color = DIAGRAM_COLORS['room_bg'] if not location.has_idf else DIAGRAM_COLORS['idf_room_bg']
         c.setFillColor(fill_color)
-        c.setStrokeColor(colors.HexColor('#566573'))
+        c.setStrokeColor(DIAGRAM_COLORS['room'])
         c.setLineWidth(1.5)
         c.roundRect(x, y, width, height, 8, fill=1, stroke=1)
         
         # Title
         title_height = 20
-        c.setFillColor(colors.HexColor('#566573'))
+        c.setFillColor(DIAGRAM_COLORS['room'])
         c.rect(x, y + height - title_height, width, title_height, fill=1, stroke=0)
         
         c.setFillColor(colors.white)
@@ -470,7 +517,7 @@ class BlockDiagramGenerator:
         
         # IDF indicator
         if location.has_idf:
-            c.setFillColor(colors.HexColor('#E67E22'))
+            c.setFillColor(DIAGRAM_COLORS['backbone'])
             c.setFont("Helvetica-Bold", 7)
             c.drawString(x + 3, y + height - title_height - 10, "📡 IDF")
         
@@ -507,7 +554,7 @@ class BlockDiagramGenerator:
     
     def draw_network_backbone(self, c, x, y, width, height):
         """Draw the network backbone bar"""
-        c.setFillColor(colors.HexColor('#E67E22'))
+        c.setFillColor(DIAGRAM_COLORS['backbone'])
         c.roundRect(x, y, width, height, 5, fill=1, stroke=0)
         
         c.setFillColor(colors.white)
@@ -516,20 +563,30 @@ class BlockDiagramGenerator:
     
     def draw_connection_arrow(self, c, x1, y1, x2, y2, color, label=None):
         """Draw a connection arrow"""
+        self.draw_connection_arrows(c, [(x1, y1, x2, y2)], color)
+    
+    def draw_connection_arrows(self, c, arrows, color):
+        """Draw several same-colored connection arrows with one stroke setup"""
         c.setStrokeColor(color)
         c.setLineWidth(2)
-        c.line(x1, y1, x2, y2)
         
-        # Arrow head
-        import math
-        angle = math.atan2(y2 - y1, x2 - x1)
+        # All shafts and heads go into one path, stroked once
+        path = c.beginPath()
         arrow_len = 8
-        c.line(x2, y2, 
-               x2 - arrow_len * math.cos(angle - 0.4), 
-               y2 - arrow_len * math.sin(angle - 0.4))
-        c.line(x2, y2, 
-               x2 - arrow_len * math.cos(angle + 0.4), 
-               y2 - arrow_len * math.sin(angle + 0.4))
+        for x1, y1, x2, y2 in arrows:
+            path.moveTo(x1, y1)
+            path.lineTo(x2, y2)
+            
+            # Arrow head
+            angle = math.atan2(y2 - y1, x2 - x1)
+            path.moveTo(x2, y2)
+            path.lineTo(x2 - arrow_len * math.cos(angle - 0.4), 
+                        y2 - arrow_len * math.sin(angle - 0.4))
+            path.moveTo(x2, y2)
+            path.lineTo(x2 - arrow_len * math.cos(angle + 0.4), 
+                        y2 - arrow_len * math.sin(angle + 0.4))
+        
+        c.drawPath(path, stroke=1, fill=0)
     
     def generate(self, intent: SystemIntent, locations: Dict[str, LocationBlock], 
                 output_path: str, project_name: str = "AV System"):
@@ -543,6 +600,14 @@ class BlockDiagramGenerator:
         c.setFont("Helvetica", 12)
         c.drawString(self.margin, self.page_height - 0.6 * inch, "System Block Diagram")
         
+        # Nothing parsed - skip the layout entirely
+        if not locations:
+            c.setFont("Helvetica", 12)
+            c.drawCentredString(self.page_width / 2, self.page_height / 2,
+                               "No equipment found in CSV")
+            c.save()
+            return output_path
+        
         # Find head-end and rooms
         head_end = None
         rooms = []
@@ -583,7 +648,7 @@ class BlockDiagramGenerator:
         self.draw_connection_arrow(c, 
             head_end_x + head_end_width/2, head_end_y,
             head_end_x + head_end_width/2, backbone_y + backbone_height,
-            colors.HexColor('#E67E22'))
+            DIAGRAM_COLORS['backbone'])
         
         # Room blocks (bottom rows)
         room_area_top = backbone_y - 0.3 * inch
@@ -598,22 +663,28 @@ class BlockDiagramGenerator:
         room_width = (self.content_width - (cols + 1) * room_margin) / cols if cols > 0 else 2 * inch
         room_height = min(1.8 * inch, (room_area_height - (rows + 1) * room_margin) / rows) if rows > 0 else 1.5 * inch
         
+        # Grid origin and strides don't change per room
+        left_x = self.margin + room_margin
+        top_y = room_area_top - room_height
+        stride_x = room_width + room_margin
+        stride_y = room_height + room_margin
+        half_width = room_width / 2
+        
         # First pass: Draw all arrows BEHIND the room blocks
         room_positions = []
+        room_arrows = []
         for i, room in enumerate(rooms[:12]):  # Max 12 rooms
-            col = i % cols
-            row = i // cols
+            row, col = divmod(i, cols)
             
-            rx = self.margin + room_margin + col * (room_width + room_margin)
-            ry = room_area_top - room_height - row * (room_height + room_margin)
+            rx = left_x + col * stride_x
+            ry = top_y - row * stride_y
             room_positions.append((rx, ry, room))
             
-            # Draw connection arrow (behind)
-            conn_x = rx + room_width / 2
-            self.draw_connection_arrow(c,
-                conn_x, backbone_y,
-                conn_x, ry + room_height,
-                colors.HexColor('#566573'))
+            # Connection arrow (behind)
+            conn_x = rx + half_width
+            room_arrows.append((conn_x, backbone_y, conn_x, ry + room_height))
+        
+        self.draw_connection_arrows(c, room_arrows, DIAGRAM_COLORS['room'])
         
         # Second pass: Draw all room blocks ON TOP of arrows
         for rx, ry, room in room_positions:
@@ -627,16 +698,16 @@ class BlockDiagramGenerator:
         c.drawString(legend_x, legend_y + 1.2 * inch, "SYSTEMS")
         
         c.setFont("Helvetica", 7)
-        for i, (system, color) in enumerate(list(SYSTEM_COLORS.items())[:8]):
+        for i, (color, label) in enumerate(LEGEND_ENTRIES):
             ly = legend_y + 1 * inch - i * 12
             c.setFillColor(color)
             c.circle(legend_x + 5, ly + 2, 4, fill=1, stroke=0)
             c.setFillColor(colors.black)
-            c.drawString(legend_x + 15, ly, SYSTEM_LABELS.get(system, system))
+            c.drawString(legend_x + 15, ly, label)
         
         # Footer
         c.setFont("Helvetica", 8)
-        c.setFillColor(colors.HexColor('#7F8C8D'))
+        c.setFillColor(DIAGRAM_COLORS['footer'])
         from datetime import datetime
         c.drawString(self.margin, self.margin - 0.1 * inch, 
                     f"Generated: {datetime.now().strftime('%m/%d/%Y')} | Page Size: 11x17")
@@ -651,7 +722,8 @@ def generate_block_diagram(
     project_name: str = "AV System",
     intent_csv: str = None,
     intent: SystemIntent = None,
-    page_size: str = 'tabloid'
+    page_size: str = 'tabloid',
+    rows: List[Dict[str, str]] = None
 ) -> str:
     """Main function to generate block diagram
     
@@ -662,10 +734,14 @@ def generate_block_diagram(
         intent_csv: Optional path to system intent CSV
         intent: Optional SystemIntent object (takes precedence over intent_csv)
         page_size: Page size ('tabloid', 'arch_d', etc.)
+        rows: Optional already-read CSV rows (skips re-reading equipment_csv)
     """
     
-    print(f"📄 Parsing equipment CSV: {equipment_csv}")
-    locations = parse_equipment_csv(equipment_csv)
+    if rows is not None:
+        locations = locations_from_rows(rows)
+    else:
+        print(f"📄 Parsing equipment CSV: {equipment_csv}")
+        locations = parse_equipment_csv(equipment_csv)
     print(f"📊 Found {len(locations)} locations")
     
     # Use provided intent, or parse from CSV, or use defaults
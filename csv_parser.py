@@ -5,10 +5,79 @@ Supports multiple CSV formats from different clients
 """
 
 import csv
+import io
+import re
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+# Encodings tried, in order, when reading a CSV file
+CSV_ENCODINGS = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252']
+
+# SI/AVC rows: equipment closet keywords to look for in LocationPath, and
+# systems that typically contain rack-mounted equipment (one scan per field)
+EQUIPMENT_AREA_RE = re.compile('|'.join(map(re.escape, [
+    'equipment closet', 'equipment room', 'rack', 'av closet', 'network closet', 'mdf', 'idf'
+])))
+RACK_SYSTEM_RE = re.compile('|'.join(map(re.escape, [
+    'network & wifi', 'equipment racks', 'lighting control', 'hvac'
+])))
+
+# SI/AVC part numbers of generic/placeholder items (upper case, for str.startswith)
+SKIP_PART_PREFIXES = tuple(prefix.upper() for prefix in (
+    'BRKT:', 'PLATE:', 'CONN-', 'DATA-', 'VIDEO-', 'AUDIO-', 'CONTROL -',
+    'DEVICE -', 'NETWORK ', 'UI -', 'IP ', 'AMP-', 'SPEAKER ', 'INTERFACE -',
+    'SPACESAVER', 'CAT6', 'RG6', '14/', '16/', 'LUTRON-GRN'
+))
+
+# Keywords that identify a rack (not rack-mounted equipment)
+RACK_KEYWORDS = ['equipment rack', 'av rack', 'network rack', 'server rack', 'data rack']
+
+# Model patterns that indicate racks with size info
+# Format: (pattern_prefix, typical brand)
+RACK_MODEL_PATTERNS = {
+    'ERK-': 'Middle Atlantic',      # ERK-4425 = 44U, 25" deep
+    'SSRK-': 'Middle Atlantic',     # SSRK-42 = 42U slim
+    'RK-': 'Middle Atlantic',       # RK-42 = 42U
+    'SR-': 'Middle Atlantic',       # SR-42-26 = 42U, 26" deep
+    'WRK-': 'Middle Atlantic',      # Wall-mount rack
+    'CFR-': 'Middle Atlantic',      # CFR-12-18 = 12U
+    'QUIK-': 'Middle Atlantic',     # Quick-frame
+    'MRK-': 'Middle Atlantic',      # MRK series
+    'AXS-': 'Middle Atlantic',      # AXS series
+    '42U': 'Generic',
+    '48U': 'Generic', 
+    '24U': 'Generic',
+    '18U': 'Generic',
+    '12U': 'Generic',
+    'RE42-': 'Chief',
+    'CMS-': 'Chief',
+}
+
+# Rows naming a rack: any rack keyword or model pattern, matched in one scan
+# of "part_number name" (lower-cased)
+RACK_ROW_RE = re.compile('|'.join(
+    re.escape(keyword.lower()) for keyword in [*RACK_KEYWORDS, *RACK_MODEL_PATTERNS]
+))
+
+# Rack size patterns in model numbers like ERK-4425, RK-42, 42U, SR-42-26,
+# compiled once instead of on every row
+RACK_SIZE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r'(\d{2})U',           # 42U, 48U, etc.
+        r'ERK-(\d{2})',        # ERK-44xx
+        r'SSRK-(\d{2})',       # SSRK-42
+        r'RK-(\d{2})',         # RK-42
+        r'SR-(\d{2})',         # SR-42-26
+        r'MRK-(\d{2})',        # MRK-44
+        r'CFR-(\d{1,2})',      # CFR-12-18
+        r'WRK-(\d{1,2})',      # WRK-8
+        r'-(\d{2})[-\s]?[Uu]', # Generic -42U pattern
+        r'(\d{2})[-\s]?[Rr][Uu]', # 42RU pattern
+    )
+]
+
 
 @dataclass
 class ProductFromCSV:
@@ -30,6 +99,18 @@ class ProductFromCSV:
     btu: Optional[float] = None
     front_image_url: Optional[str] = None
     connections: Optional[dict] = None
+    
+    # Lower-cased copies for the keyword filters and dedup, computed once
+    brand_lc: str = field(init=False, repr=False, compare=False)
+    model_lc: str = field(init=False, repr=False, compare=False)
+    name_lc: str = field(init=False, repr=False, compare=False)
+    category_lc: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.brand_lc = (self.brand or '').lower()
+        self.model_lc = (self.model or '').lower()
+        self.name_lc = (self.name or '').lower()
+        self.category_lc = (self.category or '').lower()
 
 
 @dataclass
@@ -54,6 +135,32 @@ def detect_csv_format(headers: List[str]) -> str:
         return 'unknown'
 
 
+def read_csv_rows(csv_path: str) -> Tuple[List[str], List[Dict[str, str]]]:
+    """
+    Read a CSV file once, trying each of CSV_ENCODINGS.
+    
+    Returns:
+        (headers, rows) - both empty if the file could not be decoded
+    """
+    file_content = None
+    
+    for encoding in CSV_ENCODINGS:
+        try:
+            with open(csv_path, 'r', encoding=encoding) as f:
+                file_content = f.read()
+            break
+        except UnicodeDecodeError:
+            continue
+    
+    if file_content is None:
+        print("❌ Could not decode CSV file with any known encoding")
+        return [], []
+    
+    reader = csv.DictReader(io.StringIO(file_content))
+    rows = list(reader)
+    return reader.fieldnames or [], rows
+
+
 def parse_client_csv(csv_path: str, equipment_location: Optional[str] = None) -> List[ProductFromCSV]:
     """
     Parse a client proposal CSV and extract products.
@@ -66,53 +173,69 @@ def parse_client_csv(csv_path: str, equipment_location: Optional[str] = None) ->
     Returns:
         List of ProductFromCSV objects
     """
+    headers, rows = read_csv_rows(csv_path)
+    return products_from_rows(headers, rows, equipment_location)
+
+
+def parse_client_csv_and_racks(csv_path: str, equipment_location: Optional[str] = None) -> Tuple[List[ProductFromCSV], dict]:
+    """
+    Parse a client proposal CSV for both its products and its racks,
+    reading the file only once.
+    
+    Returns:
+        (products, rack_info) as from parse_client_csv and get_rack_info_from_csv
+    """
+    headers, rows = read_csv_rows(csv_path)
+    products = products_from_rows(headers, rows, equipment_location)
+    rack_info = rack_info_from_racks(racks_from_rows(rows))
+    return products, rack_info
+
+
+def products_from_rows(headers: List[str], rows: List[Dict[str, str]], equipment_location: Optional[str] = None) -> List[ProductFromCSV]:
+    """Extract products from already-read CSV rows (see parse_client_csv)"""
     products = []
+    csv_format = detect_csv_format(headers)
     
-    with open(csv_path, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        headers = reader.fieldnames or []
-        csv_format = detect_csv_format(headers)
-        
-        print(f"📋 Detected CSV format: {csv_format}")
+    print(f"📋 Detected CSV format: {csv_format}")
+    
+    if csv_format == 'si_avc':
+        return si_avc_products_from_rows(rows, equipment_location)
+    
+    # Standard format parsing
+    for row in rows:
+        location = row.get('Location', '').strip()
         
-        if csv_format == 'si_avc':
-            return parse_si_avc_format(csv_path, equipment_location)
+        # Filter by equipment location if specified
+        if equipment_location and location != equipment_location:
+            continue
         
-        # Standard format parsing
-        for row in reader:
-            location = row.get('Location', '').strip()
-            
-            # Filter by equipment location if specified
-            if equipment_location and location != equipment_location:
-                continue
-            
-            # Skip items with zero or negative quantity
-            try:
-                quantity = int(row.get('Quantity', 0))
-                if quantity <= 0:
-                    continue
-            except ValueError:
+        # Skip items with zero or negative quantity
+        try:
+            quantity = int(row.get('Quantity', 0))
+            if quantity <= 0:
                 continue
-            
-            # Parse BTU if present
-            try:
-                calculated_btu = float(row.get('Calculated_BTU', 0) or 0)
-            except ValueError:
-                calculated_btu = 0.0
-            
-            product = ProductFromCSV(
-                name=row.get('Name', '').strip(),
-                brand=row.get('Brand', '').strip(),
-                model=row.get('Model', '').strip(),
-                category=row.get('Category', '').strip(),
-                quantity=quantity,
-                location=location,
-                system=row.get('System', '').strip(),
-                description=row.get('Short Description', '').strip(),
-                calculated_btu=calculated_btu
-            )
-            
-            products.append(product)
+        except ValueError:
+            continue
+        
+        # Parse BTU if present
+        try:
+            calculated_btu = float(row.get('Calculated_BTU', 0) or 0)
+        except ValueError:
+            calculated_btu = 0.0
+        
+        product = ProductFromCSV(
+            name=row.get('Name', '').strip(),
+            brand=row.get('Brand', '').strip(),
+            model=row.get('Model', '').strip(),
+            category=row.get('Category', '').strip(),
+            quantity=quantity,
+            location=location,
+            system=row.get('System', '').strip(),
+            description=row.get('Short Description', '').strip(),
+            calculated_btu=calculated_btu
+        )
+        
+        products.append(product)
     
     return products
 
@@ -122,35 +245,15 @@ def parse_si_avc_format(csv_path: str, equipment_location: Optional[str] = None)
     Parse SI/AVC format CSV files.
     These have columns: Quantity, Part Number, Cost Price, Sell Price, TotalLaborHours, Time (hrs), Phase, LocationPath, System
     """
+    _, rows = read_csv_rows(csv_path)
+    return si_avc_products_from_rows(rows, equipment_location)
+
+
+def si_avc_products_from_rows(rows: List[Dict[str, str]], equipment_location: Optional[str] = None) -> List[ProductFromCSV]:
+    """Extract products from already-read SI/AVC format rows (see parse_si_avc_format)"""
     products = []
     
-    # Equipment closet keywords to look for in LocationPath
-    equipment_keywords = ['equipment closet', 'equipment room', 'rack', 'av closet', 'network closet', 'mdf', 'idf']
-    
-    # Systems that typically contain rack-mounted equipment
-    rack_systems = ['network & wifi', 'equipment racks', 'lighting control', 'hvac']
-    
-    # Try different encodings
-    encodings = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252']
-    file_content = None
-    
-    for encoding in encodings:
-        try:
-            with open(csv_path, 'r', encoding=encoding) as f:
-                file_content = f.read()
-            break
-        except UnicodeDecodeError:
-            continue
-    
-    if file_content is None:
-        print("❌ Could not decode CSV file with any known encoding")
-        return []
-    
-    import io
-    f = io.StringIO(file_content)
-    reader = csv.DictReader(f)
-    
-    for row in reader:
+    for row in rows:
         location = row.get('LocationPath', '').strip()
         system = row.get('System', '').strip()
         part_number = row.get('Part Number', '').strip()
@@ -160,10 +263,7 @@ def parse_si_avc_format(csv_path: str, equipment_location: Optional[str] = None)
             continue
         
         # Skip generic/placeholder items
-        skip_prefixes = ['BRKT:', 'PLATE:', 'CONN-', 'DATA-', 'VIDEO-', 'AUDIO-', 'CONTROL -', 
-                       'DEVICE -', 'NETWORK ', 'UI -', 'IP ', 'AMP-', 'SPEAKER ', 'INTERFACE -',
-                       'SPACESAVER', 'CAT6', 'RG6', '14/', '16/', 'LUTRON-GRN']
-        if any(part_number.upper().startswith(prefix.upper()) for prefix in skip_prefixes):
+        if part_number.upper().startswith(SKIP_PART_PREFIXES):
             continue
         
         # Filter by location if specified, otherwise look for equipment areas
@@ -175,9 +275,9 @@ def parse_si_avc_format(csv_path: str, equipment_location: Optional[str] = None)
                 continue
         else:
             # Auto-detect equipment closet/rack locations
-            is_equipment_area = any(kw in location_lower for kw in equipment_keywords)
+            is_equipment_area = EQUIPMENT_AREA_RE.search(location_lower) is not None
             # Also check if it's in a system that typically has rack-mounted gear
-            is_rack_system = any(rs in system_lower for rs in rack_systems)
+            is_rack_system = RACK_SYSTEM_RE.search(system_lower) is not None
             
             if not is_equipment_area and not is_rack_system:
                 continue
@@ -280,7 +380,7 @@ def get_unique_products_with_quantities(products: List[ProductFromCSV]) -> List[
         if product.part_number:
             key = product.part_number.lower()
         else:
-            key = (product.brand.lower(), product.model.lower())
+            key = (product.brand_lc, product.model_lc)
         
         if key in product_map:
             product_map[key].quantity += product.quantity
@@ -303,53 +403,15 @@ def detect_racks_from_csv(csv_path: str) -> List[RackFromCSV]:
     Returns:
         List of RackFromCSV objects with detected size and quantity
     """
+    _, rows = read_csv_rows(csv_path)
+    return racks_from_rows(rows)
+
+
+def racks_from_rows(rows: List[Dict[str, str]]) -> List[RackFromCSV]:
+    """Detect racks in already-read CSV rows (see detect_racks_from_csv)"""
     racks = []
     
-    # Keywords that identify a rack (not rack-mounted equipment)
-    rack_keywords = ['equipment rack', 'av rack', 'network rack', 'server rack', 'data rack']
-    
-    # Model patterns that indicate racks with size info
-    # Format: (pattern_prefix, typical brand)
-    rack_model_patterns = {
-        'ERK-': 'Middle Atlantic',      # ERK-4425 = 44U, 25" deep
-        'SSRK-': 'Middle Atlantic',     # SSRK-42 = 42U slim
-        'RK-': 'Middle Atlantic',       # RK-42 = 42U
-        'SR-': 'Middle Atlantic',       # SR-42-26 = 42U, 26" deep
-        'WRK-': 'Middle Atlantic',      # Wall-mount rack
-        'CFR-': 'Middle Atlantic',      # CFR-12-18 = 12U
-        'QUIK-': 'Middle Atlantic',     # Quick-frame
-        'MRK-': 'Middle Atlantic',      # MRK series
-        'AXS-': 'Middle Atlantic',      # AXS series
-        '42U': 'Generic',
-        '48U': 'Generic', 
-        '24U': 'Generic',
-        '18U': 'Generic',
-        '12U': 'Generic',
-        'RE42-': 'Chief',
-        'CMS-': 'Chief',
-    }
-    
-    # Try different encodings
-    encodings = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252']
-    file_content = None
-    
-    for encoding in encodings:
-        try:
-            with open(csv_path, 'r', encoding=encoding) as f:
-                file_content = f.read()
-            break
-        except UnicodeDecodeError:
-            continue
-    
-    if file_content is None:
-        return []
-    
-    import io
-    import re
-    f = io.StringIO(file_content)
-    reader = csv.DictReader(f)
-    
-    for row in reader:
+    for row in rows:
         # Get relevant fields
         part_number = row.get('Part Number', row.get('Model', '')).strip()
         name = row.get('Name', part_number).strip()
@@ -365,44 +427,18 @@ def detect_racks_from_csv(csv_path: str) -> List[RackFromCSV]:
         except ValueError:
             quantity = 1
         
-        part_lower = part_number.lower()
-        name_lower = name.lower()
-        combined = f"{part_lower} {name_lower}"
-        
         # Check if this is a rack (not rack-mounted equipment)
-        is_rack = any(kw in combined for kw in rack_keywords)
-        
-        # Also check model patterns
-        for pattern in rack_model_patterns.keys():
-            if pattern.lower() in part_lower or pattern.lower() in name_lower:
-                is_rack = True
-                break
-        
-        if not is_rack:
+        if not RACK_ROW_RE.search(f"{part_number} {name}".lower()):
             continue
         
         # Now try to determine the rack size
         size_u = 42  # Default to 42U if we can't determine
         
         # Try to extract size from model number
-        # Patterns like: ERK-4425, RK-42, 42U, SR-42-26
-        size_patterns = [
-            r'(\d{2})U',           # 42U, 48U, etc.
-            r'ERK-(\d{2})',        # ERK-44xx
-            r'SSRK-(\d{2})',       # SSRK-42
-            r'RK-(\d{2})',         # RK-42
-            r'SR-(\d{2})',         # SR-42-26
-            r'MRK-(\d{2})',        # MRK-44
-            r'CFR-(\d{1,2})',      # CFR-12-18
-            r'WRK-(\d{1,2})',      # WRK-8
-            r'-(\d{2})[-\s]?[Uu]', # Generic -42U pattern
-            r'(\d{2})[-\s]?[Rr][Uu]', # 42RU pattern
-        ]
-        
-        for pattern in size_patterns:
-            match = re.search(pattern, part_number, re.IGNORECASE)
+        for pattern in RACK_SIZE_PATTERNS:
+            match = pattern.search(part_number)
             if not match:
-                match = re.search(pattern, name, re.IGNORECASE)
+                match = pattern.search(name)
             if match:
                 extracted = int(match.group(1))
                 # Sanity check - racks are typically 8-52U
@@ -412,9 +448,11 @@ def detect_racks_from_csv(csv_path: str) -> List[RackFromCSV]:
         
         # Determine rack type based on location/system
         rack_type = "AV"  # Default
-        if 'network' in location.lower() or 'network' in system.lower():
+        location_lower = location.lower()
+        system_lower = system.lower()
+        if 'network' in location_lower or 'network' in system_lower:
             rack_type = "Network"
-        elif 'server' in location.lower() or 'data' in system.lower():
+        elif 'server' in location_lower or 'data' in system_lower:
             rack_type = "Network"
         
         rack = RackFromCSV(
@@ -440,8 +478,11 @@ def get_rack_info_from_csv(csv_path: str) -> dict:
         - network_rack_size: Size to use for Network rack (or None)
         - default_size: Suggested default size if no racks found
     """
-    racks = detect_racks_from_csv(csv_path)
-    
+    return rack_info_from_racks(detect_racks_from_csv(csv_path))
+
+
+def rack_info_from_racks(racks: List[RackFromCSV]) -> dict:
+    """Rack configuration info for already-detected racks (see get_rack_info_from_csv)"""
     result = {
         'racks': racks,
         'total_racks': sum(r.quantity for r in racks),
@@ -4,7 +4,15 @@ Replaces Airtable as the "Brain" for equipment specifications
 """
 
 import os
-from typing import Optional, Dict, List
+import re
+import sys
+import time
+import queue
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Dict, List, Tuple, Any
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -15,12 +23,235 @@ load_dotenv(Path(__file__).parent / ".env")
 # Try to import MySQL connector
 try:
     import mysql.connector
-    from mysql.connector import Error
+    from mysql.connector import Error, InterfaceError, OperationalError, PoolError
+    from mysql.connector.pooling import (
+        CNX_POOL_MAXSIZE, CONNECTION_POOL_LOCK, MySQLConnectionPool, PooledMySQLConnection
+    )
     MYSQL_AVAILABLE = True
 except ImportError:
     MYSQL_AVAILABLE = False
     print("⚠️  mysql-connector-python not installed. Run: pip3 install mysql-connector-python")
 
+# Connection settings, read once at import
+MYSQL_HOST = os.getenv("MYSQL_HOST", "localhost")
+MYSQL_PORT = int(os.getenv("MYSQL_PORT", "3306"))
+MYSQL_USER = os.getenv("MYSQL_USER", "root")
+MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "")
+MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "av_catalog")
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "8"))
+
+# How long a query waits for a free pooled connection before giving up
+# (the pool itself raises PoolError at once when every connection is out)
+MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "30"))  # seconds
+
+# Pooled connections used more recently than this are handed out without a
+# ping; older ones are checked first, as the server drops idle connections
+# after wait_timeout
+MYSQL_PING_AFTER = float(os.getenv("MYSQL_PING_AFTER", "300"))  # seconds
+
+# enqueue_product: how long the background writer waits to fill a batch
+WRITE_BEHIND_WAIT = 0.05  # seconds
+
+# Minimum key/query length for fuzzy matching, also the n-gram index granularity
+FUZZY_MIN_LEN = 4
+
+# Rack-mountable products, already shaped like the cache entries: NULLs
+# defaulted and DECIMALs turned into floats (* 1E0 yields a DOUBLE) by MySQL.
+# Lookup keys are normalized in Python, the same way as queries: SQL TRIM()
+# strips only spaces and LOWER() follows the column collation.
+CATALOG_COLUMNS_SQL = """
+SELECT
+    id,
+    IFNULL(brand, '') AS brand,
+    IFNULL(model, '') AS model,
+    IFNULL(name, '') AS name,
+    IFNULL(part_number, '') AS part_number,
+    IFNULL(NULLIF(height_u, 0), 1) AS rack_units,
+    IFNULL(NULLIF(height_u, 0), 1) AS height_u,
+    IFNULL(watts, 0) * 1E0 AS watts,
+    IFNULL(btu, 0) * 1E0 AS btu,
+    IFNULL(weight, 0) * 1E0 AS weight,
+    IFNULL(NULLIF(subsystem, ''), 'AV') AS subsystem,
+    is_rack_mountable,
+    IFNULL(category, '') AS category,
+    IFNULL(connections, '') AS connections,
+    'mysql' AS source
+FROM product_catalog
+"""
+CATALOG_SELECT_SQL = CATALOG_COLUMNS_SQL + "WHERE is_rack_mountable = TRUE\n"
+
+# CatalogProduct fields returned by get_rack_specs
+RACK_SPEC_FIELDS = (
+    'rack_units', 'height_u', 'weight', 'watts', 'btu', 'subsystem',
+    'is_rack_mountable', 'brand', 'model', 'connections', 'source'
+)
+
+# Entries kept in each lookup memo before it is reset
+LOOKUP_MEMO_SIZE = 4096
+
+# Written products re-read into a loaded cache before the next lookup; a
+# larger backlog of writes just drops the cache for a lazy full reload
+REFRESH_MAX_PRODUCTS = 50
+
+# Model numbers vary mostly in punctuation and suffixes ("USW-Pro-24" vs
+# "usw pro 24 poe"), so fuzzy lookups first try keys sharing the query's
+# leading alphanumerics
+SHAPE_TOKEN_LEN = 4
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]')
+
+# search_products: the shortest word InnoDB indexes (innodb_ft_min_token_size)
+FULLTEXT_MIN_TOKEN = 3
+ER_FT_MATCHING_KEY_NOT_FOUND = 1191  # Table predates the FULLTEXT index
+
+# Rows per multi-row INSERT in bulk_add_products (13 placeholders each,
+# well under MySQL's 65535 parameter limit)
+BULK_BATCH_SIZE = 500
+
+# Insert products, or update them if (brand, model) already exists.
+# Built from parts so bulk_add_products can repeat the row placeholder.
+UPSERT_SQL_HEAD = """
+INSERT INTO product_catalog 
+    (brand, model, name, part_number, height_u, watts, btu, weight, subsystem, is_rack_mountable, category, connections, notes)
+VALUES 
+"""
+UPSERT_ROW = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+UPSERT_SQL_TAIL = """
+ON DUPLICATE KEY UPDATE
+    name = VALUES(name),
+    part_number = VALUES(part_number),
+    height_u = VALUES(height_u),
+    watts = VALUES(watts),
+    btu = VALUES(btu),
+    weight = VALUES(weight),
+    subsystem = VALUES(subsystem),
+    is_rack_mountable = VALUES(is_rack_mountable),
+    category = VALUES(category),
+    connections = VALUES(connections),
+    notes = VALUES(notes)
+"""
+
+
+def _multi_row_upsert_sql(rows: int) -> str:
+    """Upsert statement with `rows` value tuples, so a whole batch is one statement"""
+    return UPSERT_SQL_HEAD + "    " + ",\n    ".join([UPSERT_ROW] * rows) + UPSERT_SQL_TAIL
+
+
+UPSERT_SQL = _multi_row_upsert_sql(1)
+
+
+def _upsert_params(product: Dict) -> tuple:
+    """UPSERT_SQL parameters for a product dict"""
+    return (
+        product.get('brand', ''),
+        product.get('model', ''),
+        product.get('name', ''),
+        product.get('part_number', ''),
+        product.get('height_u', 1),
+        product.get('watts', 0),
+        product.get('btu', 0),
+        product.get('weight', 0),
+        product.get('subsystem', 'AV'),
+        product.get('is_rack_mountable', True),
+        product.get('category', ''),
+        product.get('connections', ''),
+        product.get('notes', '')
+    )
+
+
+# Columns add_product_fields may write; (brand, model) identify the product
+UPSERT_KEY_COLUMNS = ('brand', 'model')
+UPSERT_VALUE_COLUMNS = (
+    'name', 'part_number', 'height_u', 'watts', 'btu', 'weight', 'subsystem',
+    'is_rack_mountable', 'category', 'connections', 'notes'
+)
+
+# Update an existing product in place; parameters are the UPSERT_SQL ones
+# with (brand, model) moved to the end
+UPDATE_SQL = (
+    f"UPDATE product_catalog SET {', '.join(f'{column} = %s' for column in UPSERT_VALUE_COLUMNS)} "
+    "WHERE brand = %s AND model = %s"
+)
+
+
+@lru_cache(maxsize=64)
+def _partial_upsert_sql(fields: Tuple[str, ...]) -> str:
+    """Upsert statement writing only the given value columns (plus brand and model)"""
+    unknown = set(fields) - set(UPSERT_VALUE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown product columns: {', '.join(sorted(unknown))}")
+    if not fields:
+        raise ValueError("At least one column to update is required")
+    
+    columns = UPSERT_KEY_COLUMNS + fields
+    return (
+        f"INSERT INTO product_catalog ({', '.join(columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))}) "
+        f"ON DUPLICATE KEY UPDATE {', '.join(f'{field} = VALUES({field})' for field in fields)}"
+    )
+
+
+@dataclass(slots=True)
+class CatalogProduct:
+    """A rack-mountable product from the catalog (one per product_catalog row)"""
+    id: int
+    brand: str = ''
+    model: str = ''
+    name: str = ''
+    part_number: str = ''
+    rack_units: int = 1
+    height_u: int = 1
+    watts: float = 0.0
+    btu: float = 0.0
+    weight: float = 0.0
+    subsystem: str = 'AV'
+    is_rack_mountable: bool = True
+    category: str = ''
+    connections: str = ''
+    source: str = 'mysql'
+
+
+def _product_from_row(row: Dict) -> CatalogProduct:
+    """Build a CatalogProduct from a CATALOG_COLUMNS_SQL row"""
+    row['is_rack_mountable'] = bool(row['is_rack_mountable'])
+    return CatalogProduct(**row)
+
+
+if MYSQL_AVAILABLE:
+    class _LazyPingPool(MySQLConnectionPool):
+        """
+        MySQLConnectionPool that only pings connections idle for MYSQL_PING_AFTER.
+        
+        The stock get_connection() pings every connection it hands out, an
+        extra round-trip per query. A connection that fails mid-query is
+        revived by ProductDatabase._connection instead. (The stock check also
+        picks up set_config() changes; this pool's config never changes.)
+        """
+        
+        def __init__(self, **kwargs):
+            self._returned_at: Dict[int, float] = {}  # id(connection) -> last return
+            super().__init__(**kwargs)
+        
+        def get_connection(self) -> "PooledMySQLConnection":
+            with CONNECTION_POOL_LOCK:
+                try:
+                    cnx = self._cnx_queue.get(block=False)
+                except queue.Empty:
+                    raise PoolError("Failed getting connection; pool exhausted") from None
+            
+            returned_at = self._returned_at.get(id(cnx))
+            if returned_at is None or time.monotonic() - returned_at > MYSQL_PING_AFTER:
+                try:
+                    cnx.ping(reconnect=True)
+                except Error:
+                    self._cnx_queue.put(cnx, block=False)
+                    raise
+            return PooledMySQLConnection(self, cnx)
+        
+        def add_connection(self, cnx=None) -> None:
+            super().add_connection(cnx)
+            if cnx is not None:
+                self._returned_at[id(cnx)] = time.monotonic()
+
 
 class ProductDatabase:
     """
@@ -32,45 +263,179 @@ class ProductDatabase:
         if not MYSQL_AVAILABLE:
             raise ImportError("mysql-connector-python is required. Install with: pip3 install mysql-connector-python")
         
-        # Load credentials from .env
-        self.host = os.getenv("MYSQL_HOST", "localhost")
-        self.port = int(os.getenv("MYSQL_PORT", "3306"))
-        self.user = os.getenv("MYSQL_USER", "root")
-        self.password = os.getenv("MYSQL_PASSWORD", "")
-        self.database = os.getenv("MYSQL_DATABASE", "av_catalog")
+        # Credentials from .env
+        self.host = MYSQL_HOST
+        self.port = MYSQL_PORT
+        self.user = MYSQL_USER
+        self.password = MYSQL_PASSWORD
+        self.database = MYSQL_DATABASE
+        self.pool_size = MYSQL_POOL_SIZE
         
-        self.connection = None
-        self._product_cache: Dict[str, Dict] = {}
+        if not 1 <= self.pool_size <= CNX_POOL_MAXSIZE:
+            raise ValueError(f"MYSQL_POOL_SIZE must be between 1 and {CNX_POOL_MAXSIZE}, got {self.pool_size}")
+        
+        # Each query borrows a connection, so concurrent callers don't share one.
+        # The semaphore makes extra callers wait for a free slot instead.
+        # _pool_lock serializes creating and dropping the pool.
+        self.pool: Optional[MySQLConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        self._pool_slots = threading.BoundedSemaphore(self.pool_size)
+        
+        # add_product keeps its own connection (outside the pool, so the pool
+        # keeps all pool_size slots) with a server-side prepared upsert, so
+        # repeated calls send only parameters. _upsert_lock guards both.
+        self._upsert_connection = None
+        self._upsert_cursor = None
+        self._upsert_lock = threading.Lock()
+        
+        # Write-behind queue for enqueue_product, drained by a background thread
+        self._write_queue: "queue.Queue[Dict]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._write_errors: List[Exception] = []  # Failed batches since the last flush()
+        self._products_by_id: Dict[int, CatalogProduct] = {}  # One entry per product
+        self._alias_to_id: Dict[str, int] = {}      # Lookup key -> product id
+        self._keys_by_id: Dict[int, Tuple[str, ...]] = {}  # Product id -> its lookup keys
         self._cache_loaded = False
+        self._load_lock = threading.Lock()
+        
+        # (brand, model) of products written since the cache was loaded,
+        # re-read by the next lookup. Guarded by _load_lock.
+        self._stale_products: set = set()
+        
+        # n-gram -> cache keys containing it, for fuzzy lookups
+        self._ngram_index: Dict[str, List[str]] = {}
+        self._token_index: Dict[str, List[str]] = {}  # Shape token -> cache keys
+        
+        # Results of repeated queries (misses included), reset after writes
+        self._lookup_memo: Dict[str, Optional[CatalogProduct]] = {}
+        self._rack_specs_cache: Dict[str, Optional[Dict]] = {}
     
     def connect(self):
-        """Establish connection to MySQL"""
+        """Create the MySQL connection pool (closing the previous one, if any)"""
+        with self._pool_lock:
+            return self._open_pool()
+    
+    def _open_pool(self) -> bool:
+        """Build and check a new connection pool, then swap it in (hold _pool_lock)"""
         try:
-            self.connection = mysql.connector.connect(
+            # Autocommit, so a read leaves no open transaction (and stale
+            # snapshot) behind, and returning a connection needs no session
+            # reset. Multi-statement writes start their own transactions.
+            pool = _LazyPingPool(
+                pool_name="av_catalog",
+                pool_size=self.pool_size,
+                pool_reset_session=False,
+                autocommit=True,
                 host=self.host,
                 port=self.port,
                 user=self.user,
                 password=self.password,
                 database=self.database
             )
-            if self.connection.is_connected():
-                print(f"✅ Connected to MySQL database: {self.database}")
-                return True
+            
+            # Check the server once up front, riding out a brief restart
+            connection = pool.get_connection()
+            try:
+                connection.ping(reconnect=True, attempts=3, delay=1)
+            finally:
+                connection.close()
         except Error as e:
             print(f"❌ MySQL Connection Error: {e}")
             return False
+        
+        self._close_pool()
+        self.pool = pool
+        print(f"✅ Connected to MySQL database: {self.database}")
+        return True
     
     def disconnect(self):
-        """Close the database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            print("🔌 Disconnected from MySQL")
+        """Close the pooled connections and drop the pool (the next query creates a new one)"""
+        with self._upsert_lock:
+            self._reset_upsert_cursor()
+        
+        with self._pool_lock:
+            if self.pool:
+                self._close_pool()
+                print("🔌 Disconnected from MySQL")
+    
+    def _close_pool(self) -> None:
+        """
+        Drop the current pool, closing its idle connections (hold _pool_lock).
+        
+        Connections still borrowed are closed by _connection when they come back.
+        """
+        pool, self.pool = self.pool, None
+        if pool is not None:
+            self._close_idle(pool)
+    
+    @staticmethod
+    def _close_idle(pool: "MySQLConnectionPool") -> None:
+        """Close the connections sitting idle in a pool"""
+        try:
+            pool._remove_connections()
+        except Error:
+            pass  # Already gone along with the server
+    
+    def _current_pool(self) -> "MySQLConnectionPool":
+        """The connection pool, creating it first if needed (once, even with concurrent callers)"""
+        pool = self.pool
+        if pool is None:
+            with self._pool_lock:
+                if self.pool is None and not self._open_pool():
+                    raise Error(msg="Not connected to MySQL")
+                pool = self.pool
+        return pool
+    
+    def _replace_pool(self, stale: "MySQLConnectionPool") -> "MySQLConnectionPool":
+        """Rebuild a pool whose server went away, unless another thread already has"""
+        with self._pool_lock:
+            if self.pool in (stale, None) and not self._open_pool():
+                raise Error(msg="Not connected to MySQL")
+            return self.pool
+    
+    @contextmanager
+    def _connection(self):
+        """Borrow a connection from the pool (waiting for a free one), returning it when done"""
+        if not self._pool_slots.acquire(timeout=MYSQL_POOL_TIMEOUT):
+            raise Error(msg=f"Timed out after {MYSQL_POOL_TIMEOUT:g}s waiting for a MySQL connection")
+        
+        try:
+            # A local reference, so disconnect() in another thread can't pull
+            # the pool out from under this borrow
+            pool = self._current_pool()
+            try:
+                connection = pool.get_connection()
+            except (InterfaceError, OperationalError):
+                # Server went away since the pool was built - rebuild it once
+                pool = self._replace_pool(pool)
+                connection = pool.get_connection()
+            
+            try:
+                yield connection
+            except (InterfaceError, OperationalError):
+                # The connection may have died mid-query (server restart,
+                # wait_timeout) - revive it for the next borrower
+                try:
+                    connection.ping(reconnect=True)
+                except Error:
+                    pass
+                raise
+            finally:
+                # Left mid-transaction by an error: undo it, as nothing resets the session
+                if connection.in_transaction:
+                    try:
+                        connection.rollback()
+                    except Error:
+                        pass
+                connection.close()  # Returns it to the pool
+                if pool is not self.pool:
+                    self._close_idle(pool)  # Dropped meanwhile - close it for real
+        finally:
+            self._pool_slots.release()
     
     def initialize_schema(self):
         """Create the product_catalog table if it doesn't exist"""
-        if not self.connection or not self.connection.is_connected():
-            self.connect()
-        
         create_table_sql = """
         CREATE TABLE IF NOT EXISTS product_catalog (
             id INT AUTO_INCREMENT PRIMARY KEY,
@@ -92,17 +457,17 @@ class ProductDatabase:
             
             UNIQUE KEY unique_model (brand, model),
             INDEX idx_model (model),
-            INDEX idx_part_number (part_number),
-            INDEX idx_subsystem (subsystem)
+            FULLTEXT KEY ft_all (brand, model, name, part_number)
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
         """
         
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(create_table_sql)
-            self.connection.commit()
-            print("✅ Product catalog table ready")
-            cursor.close()
+            with self._connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(create_table_sql)
+                connection.commit()
+                print("✅ Product catalog table ready")
+                cursor.close()
             return True
         except Error as e:
             print(f"❌ Error creating table: {e}")
@@ -110,116 +475,457 @@ class ProductDatabase:
     
     def add_product(self, product: Dict) -> bool:
         """Add or update a product in the catalog"""
-        if not self.connection or not self.connection.is_connected():
-            self.connect()
-        
-        upsert_sql = """
-        INSERT INTO product_catalog 
-            (brand, model, name, part_number, height_u, watts, btu, weight, subsystem, is_rack_mountable, category, connections, notes)
-        VALUES 
-            (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            name = VALUES(name),
-            part_number = VALUES(part_number),
-            height_u = VALUES(height_u),
-            watts = VALUES(watts),
-            btu = VALUES(btu),
-            weight = VALUES(weight),
-            subsystem = VALUES(subsystem),
-            is_rack_mountable = VALUES(is_rack_mountable),
-            category = VALUES(category),
-            connections = VALUES(connections),
-            notes = VALUES(notes)
+        with self._upsert_lock:
+            try:
+                try:
+                    self._execute_upsert(product)
+                except (InterfaceError, OperationalError):
+                    # The held connection dropped - retry once on a fresh one
+                    self._reset_upsert_cursor()
+                    self._execute_upsert(product)
+            except Error as e:
+                print(f"❌ Error adding product: {e}")
+                # The statement handle dies with its connection - prepare again next time
+                self._reset_upsert_cursor()
+                return False
+        
+        self._mark_stale([product])
+        return True
+    
+    def add_product_fields(self, product: Dict, fields: Tuple[str, ...]) -> bool:
         """
+        Add or update a product, writing only the given columns.
         
+        Columns not listed keep their current values (or table defaults for a
+        new product). The generated SQL is cached per column set.
+        """
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(upsert_sql, (
-                product.get('brand', ''),
-                product.get('model', ''),
-                product.get('name', ''),
-                product.get('part_number', ''),
-                product.get('height_u', 1),
-                product.get('watts', 0),
-                product.get('btu', 0),
-                product.get('weight', 0),
-                product.get('subsystem', 'AV'),
-                product.get('is_rack_mountable', True),
-                product.get('category', ''),
-                product.get('connections', ''),
-                product.get('notes', '')
-            ))
-            self.connection.commit()
-            cursor.close()
-            return True
+            sql = _partial_upsert_sql(tuple(fields))
+            params = [product.get(column, '') for column in UPSERT_KEY_COLUMNS]
+            params.extend(product.get(field) for field in fields)
+            
+            with self._connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(sql, params)  # Autocommitted
+                cursor.close()
         except Error as e:
             print(f"❌ Error adding product: {e}")
             return False
+        
+        self._mark_stale([product])
+        return True
+    
+    def update_then_insert(self, product: Dict) -> bool:
+        """
+        Update a product that probably exists, inserting it only if not.
+        
+        Skips the insert attempt and duplicate-key handling of add_product
+        when most writes are updates. MySQL reports unchanged rows as 0
+        affected, so the fallback is the full upsert rather than a plain
+        INSERT.
+        """
+        params = _upsert_params(product)
+        try:
+            with self._connection() as connection:
+                connection.start_transaction()
+                cursor = connection.cursor()
+                cursor.execute(UPDATE_SQL, params[2:] + params[:2])
+                if cursor.rowcount == 0:
+                    cursor.execute(UPSERT_SQL, params)
+                connection.commit()
+                cursor.close()
+        except Error as e:
+            print(f"❌ Error adding product: {e}")
+            return False
+        
+        self._mark_stale([product])
+        return True
+    
+    def _execute_upsert(self, product: Dict) -> None:
+        """Run the prepared upsert for one product, preparing it first if needed (hold _upsert_lock)"""
+        if self._upsert_cursor is None:
+            self._upsert_connection = mysql.connector.connect(
+                host=self.host,
+                port=self.port,
+                user=self.user,
+                password=self.password,
+                database=self.database
+            )
+            self._upsert_cursor = self._upsert_connection.cursor(prepared=True)
+        
+        self._upsert_cursor.execute(UPSERT_SQL, _upsert_params(product))
+        self._upsert_connection.commit()
+    
+    def _reset_upsert_cursor(self) -> None:
+        """Close add_product's prepared statement and its dedicated connection (hold _upsert_lock)"""
+        for handle in (self._upsert_cursor, self._upsert_connection):
+            if handle is not None:
+                try:
+                    handle.close()
+                except Error:
+                    pass
+        self._upsert_cursor = None
+        self._upsert_connection = None
     
     def bulk_add_products(self, products: List[Dict]) -> int:
-        """Add multiple products at once"""
-        added = 0
-        for product in products:
-            if self.add_product(product):
-                added += 1
-        print(f"✅ Added/updated {added} products")
-        return added
+        """Add or update multiple products in batches, committing once at the end"""
+        params = [_upsert_params(product) for product in products]
+        
+        try:
+            self._upsert_rows(params)
+        except Error as e:
+            print(f"❌ Error adding products: {e}")
+            return 0
+        
+        self._mark_stale(products)
+        print(f"✅ Added/updated {len(params)} products")
+        return len(params)
+    
+    def _upsert_rows(self, params: List[tuple]) -> None:
+        """Upsert rows of UPSERT_SQL parameters as multi-row statements in one transaction"""
+        full_batch_sql = _multi_row_upsert_sql(BULK_BATCH_SIZE)
+        
+        with self._connection() as connection:
+            connection.start_transaction()
+            cursor = connection.cursor()
+            try:
+                for start in range(0, len(params), BULK_BATCH_SIZE):
+                    batch = params[start:start + BULK_BATCH_SIZE]
+                    sql = full_batch_sql if len(batch) == BULK_BATCH_SIZE else _multi_row_upsert_sql(len(batch))
+                    cursor.execute(sql, [value for row in batch for value in row])
+                connection.commit()
+            except Error:
+                connection.rollback()
+                raise
+            finally:
+                cursor.close()
+    
+    def enqueue_product(self, product: Dict) -> None:
+        """
+        Queue a product to be upserted in the background and return immediately.
+        
+        Queued products are written in batches of up to BULK_BATCH_SIZE. Call
+        flush() (or close()) to wait until everything queued is written; it
+        raises if a batch failed.
+        """
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_behind, daemon=True)
+                    self._writer.start()
+        
+        self._write_queue.put(product)
+    
+    def flush(self) -> None:
+        """
+        Block until every product passed to enqueue_product has been written.
+        
+        Raises the first error if any batch failed since the last flush (the
+        products in a failed batch were not written).
+        """
+        self._write_queue.join()
+        
+        with self._writer_lock:
+            errors, self._write_errors = self._write_errors, []
+        if errors:
+            raise errors[0]
+    
+    def close(self) -> None:
+        """Write any queued products, then disconnect (raising like flush() if a batch failed)"""
+        try:
+            self.flush()
+        finally:
+            self.disconnect()
+    
+    def _write_behind(self) -> None:
+        """Background writer: gather queued products into batches and upsert them"""
+        while True:
+            batch = [self._write_queue.get()]
+            
+            # Give the batch a moment to fill before writing it
+            deadline = time.monotonic() + WRITE_BEHIND_WAIT
+            while len(batch) < BULK_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._write_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                self._upsert_rows([_upsert_params(product) for product in batch])
+                self._mark_stale(batch)
+            except Exception as e:  # Keep the writer alive so flush() can't hang
+                print(f"❌ Error writing {len(batch)} queued products: {e}")
+                with self._writer_lock:
+                    self._write_errors.append(e)
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+    
+    def invalidate(self) -> None:
+        """Forget cached products and lookups so the next lookup reloads from MySQL"""
+        with self._load_lock:
+            self._drop_cache()
+    
+    def _drop_cache(self) -> None:
+        """Mark the cache for a full reload (hold _load_lock)"""
+        self._cache_loaded = False
+        self._stale_products = set()
+        self._lookup_memo = {}
+        self._rack_specs_cache = {}
+    
+    def _mark_stale(self, products: List[Dict]) -> None:
+        """
+        Note written products so the next lookup re-reads just their rows.
+        
+        Nothing is queried here, so a run of writes costs no extra round-trips;
+        the next lookup re-reads them all in one SELECT. More than
+        REFRESH_MAX_PRODUCTS pending products (or a NULL brand/model, which
+        can't be matched by IN) drops the cache for a lazy full reload instead.
+        """
+        pairs = {(product.get('brand', ''), product.get('model')) for product in products}
+        
+        # Under _load_lock, so a load that started before the write publishes
+        # its snapshot first and is then patched by the next lookup
+        with self._load_lock:
+            if not self._cache_loaded:
+                return  # The next lookup loads everything fresh
+            
+            self._stale_products |= pairs
+            if (len(self._stale_products) > REFRESH_MAX_PRODUCTS
+                    or any(brand is None or model is None for brand, model in pairs)):
+                self._drop_cache()
+    
+    def _refresh_stale_products(self) -> None:
+        """
+        Re-read the products written since the last lookup into the cache (hold _load_lock).
+        
+        Their rows are swapped into copies of the lookup maps, and new keys are
+        appended to the fuzzy indexes. The lookup memos are reset, since any
+        miss may now match. Falls back to a full reload if the rows can't be read.
+        """
+        pairs = list(self._stale_products)
+        self._stale_products = set()
+        
+        try:
+            rows = self._select_catalog_rows(pairs)
+        except Error as e:
+            print(f"⚠️  Could not refresh cached products, reloading catalog: {e}")
+            self._drop_cache()
+            self._load_catalog()
+            return
+        
+        # Copies, so lock-free readers keep a consistent pair of maps
+        products_by_id = dict(self._products_by_id)
+        alias_to_id = dict(self._alias_to_id)
+        keys_by_id = dict(self._keys_by_id)
+        
+        for row in rows:
+            product_id = row['id']
+            products_by_id.pop(product_id, None)
+            for key in keys_by_id.pop(product_id, ()):
+                if alias_to_id.get(key) == product_id:
+                    del alias_to_id[key]
+            
+            # No longer rack-mountable rows just drop out of the cache
+            if row['is_rack_mountable']:
+                self._cache_row(row, products_by_id, alias_to_id, keys_by_id)
+        
+        # Index keys that are new to the cache (keys that went away stay
+        # listed; fuzzy lookups skip them). Appending is safe for readers
+        # iterating the same lists - they just may not see the new key yet.
+        new_keys = [
+            key for row in rows for key in keys_by_id.get(row['id'], ())
+            if key not in self._alias_to_id
+        ]
+        for key in new_keys:
+            for gram in self._ngrams(key):
+                self._ngram_index.setdefault(gram, []).append(key)
+            token = self._shape_token(key) if len(key) >= FUZZY_MIN_LEN else ''
+            if token:
+                self._token_index.setdefault(token, []).append(key)
+        
+        self._products_by_id = products_by_id
+        self._alias_to_id = alias_to_id
+        self._keys_by_id = keys_by_id
+        self._lookup_memo = {}
+        self._rack_specs_cache = {}
+    
+    def _select_catalog_rows(self, pairs: List[Tuple[str, str]]) -> List[Dict]:
+        """CATALOG_COLUMNS_SQL rows (rack-mountable or not) for the given (brand, model) pairs"""
+        sql = CATALOG_COLUMNS_SQL + f"WHERE (brand, model) IN ({', '.join(['(%s, %s)'] * len(pairs))})"
+        with self._connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            try:
+                cursor.execute(sql, [value for pair in pairs for value in pair])
+                return cursor.fetchall()
+            finally:
+                cursor.close()
     
     def _load_all_products(self) -> None:
-        """Load all products from MySQL into cache"""
-        if self._cache_loaded:
+        """Load all products into cache (once, even with concurrent callers), applying pending writes"""
+        if self._cache_loaded and not self._stale_products:
             return
         
-        if not self.connection or not self.connection.is_connected():
-            self.connect()
+        with self._load_lock:
+            # Another thread may have finished loading while we waited
+            if not self._cache_loaded:
+                self._load_catalog()
+            elif self._stale_products:
+                self._refresh_stale_products()
+    
+    def _load_catalog(self) -> None:
+        """
+        Load all products from MySQL into cache.
         
+        The caches are built in locals and published at the end, so lock-free
+        readers never see a half-built cache.
+        """
         print("🧠 Loading Product Catalog from MySQL...")
         
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM product_catalog WHERE is_rack_mountable = TRUE")
-            rows = cursor.fetchall()
+            products_by_id: Dict[int, CatalogProduct] = {}
+            alias_to_id: Dict[str, int] = {}
+            keys_by_id: Dict[int, Tuple[str, ...]] = {}
             
-            for row in rows:
-                product_data = {
-                    'id': row['id'],
-                    'brand': row['brand'] or '',
-                    'model': row['model'] or '',
-                    'name': row['name'] or '',
-                    'part_number': row['part_number'] or '',
-                    'rack_units': row['height_u'] or 1,
-                    'height_u': row['height_u'] or 1,
-                    'watts': float(row['watts'] or 0),
-                    'btu': float(row['btu'] or 0),
-                    'weight': float(row['weight'] or 0),
-                    'subsystem': row['subsystem'] or 'AV',
-                    'is_rack_mountable': bool(row['is_rack_mountable']),
-                    'category': row['category'] or '',
-                    'connections': row['connections'] or '',
-                    'source': 'mysql'
-                }
-                
-                # Index by multiple keys for flexible lookup
-                model_key = row['model'].strip().lower() if row['model'] else ''
-                part_key = row['part_number'].strip().lower() if row['part_number'] else ''
-                brand = row['brand'].strip().lower() if row['brand'] else ''
-                
-                if model_key:
-                    self._product_cache[model_key] = product_data
-                if part_key:
-                    self._product_cache[part_key] = product_data
-                if brand and model_key:
-                    self._product_cache[f"{brand} {model_key}"] = product_data
+            # Unbuffered: rows are turned into cache entries as they arrive
+            # instead of first materializing the whole result set
+            with self._connection() as connection:
+                cursor = connection.cursor(dictionary=True, buffered=False)
+                try:
+                    cursor.execute(CATALOG_SELECT_SQL)
+                    
+                    for row in cursor:
+                        self._cache_row(row, products_by_id, alias_to_id, keys_by_id)
+                finally:
+                    self._close_unbuffered(cursor)
             
-            cursor.close()
+            # Publish the fully built cache, setting the flag last
+            self._ngram_index = self._build_ngram_index(alias_to_id)
+            self._token_index = self._build_token_index(alias_to_id)
+            self._products_by_id = products_by_id
+            self._alias_to_id = alias_to_id
+            self._keys_by_id = keys_by_id
             self._cache_loaded = True
-            print(f"✅ Loaded {len(rows)} products from MySQL")
+            print(f"✅ Loaded {len(products_by_id)} products from MySQL")
             
         except Error as e:
             print(f"❌ Error loading from MySQL: {e}")
             raise
     
-    def lookup_by_model(self, model_number: str) -> Optional[Dict]:
+    @staticmethod
+    def _cache_row(
+        row: Dict,
+        products_by_id: Dict[int, CatalogProduct],
+        alias_to_id: Dict[str, int],
+        keys_by_id: Dict[int, Tuple[str, ...]]
+    ) -> CatalogProduct:
+        """Add one CATALOG_COLUMNS_SQL row to the given cache maps"""
+        product = _product_from_row(row)
+        products_by_id[product.id] = product
+        
+        # Index by multiple keys for flexible lookup, normalized like queries
+        # in lookup_by_model. Interned so repeated brands share one string and
+        # the cache, index and interned queries compare by identity.
+        model_key = sys.intern(product.model.strip().lower())
+        part_key = sys.intern(product.part_number.strip().lower())
+        brand = sys.intern(product.brand.strip().lower())
+        
+        keys = []
+        if model_key:
+            keys.append(model_key)
+        if part_key:
+            keys.append(part_key)
+        if brand and model_key:
+            keys.append(sys.intern(" ".join((brand, model_key))))
+        
+        for key in keys:
+            alias_to_id[key] = product.id
+        keys_by_id[product.id] = tuple(keys)
+        return product
+    
+    @staticmethod
+    def _close_unbuffered(cursor) -> None:
+        """
+        Close an unbuffered cursor, first reading any rows left behind.
+        
+        If a loop over the cursor stops early (e.g. a row fails to convert),
+        the unread rows would otherwise stay on the connection and the next
+        borrower from the pool would get "Unread result found".
+        """
+        try:
+            cursor.fetchall()
+        except Error:
+            pass  # No result set (execute failed) or the connection is gone
+        cursor.close()
+    
+    @staticmethod
+    def _ngrams(key: str) -> set:
+        """Distinct FUZZY_MIN_LEN-grams of a key (none if it is shorter)"""
+        return {key[i:i + FUZZY_MIN_LEN] for i in range(len(key) - FUZZY_MIN_LEN + 1)}
+    
+    @classmethod
+    def _build_ngram_index(cls, keys) -> Dict[str, List[str]]:
+        """Index every FUZZY_MIN_LEN-gram of each cache key (shorter keys never fuzzy-match)"""
+        ngram_index: Dict[str, List[str]] = {}
+        for key in keys:
+            for gram in cls._ngrams(key):
+                ngram_index.setdefault(gram, []).append(key)
+        return ngram_index
+    
+    @staticmethod
+    def _shape_token(key: str) -> str:
+        """Leading SHAPE_TOKEN_LEN alphanumerics of a lower-cased key ('' if too short)"""
+        token = NON_ALNUM_RE.sub('', key)[:SHAPE_TOKEN_LEN]
+        return token if len(token) == SHAPE_TOKEN_LEN else ''
+    
+    @classmethod
+    def _build_token_index(cls, keys) -> Dict[str, List[str]]:
+        """Group cache keys by shape token"""
+        token_index: Dict[str, List[str]] = {}
+        for key in keys:
+            if len(key) >= FUZZY_MIN_LEN:
+                token = cls._shape_token(key)
+                if token:
+                    token_index.setdefault(token, []).append(key)
+        return token_index
+    
+    def _cached_product(self, key: str) -> Optional[CatalogProduct]:
+        """Cached product for an exact lookup key, or None"""
+        product_id = self._alias_to_id.get(key)
+        return self._products_by_id.get(product_id) if product_id is not None else None
+    
+    def _fuzzy_lookup(self, search_key: str) -> Optional[CatalogProduct]:
+        """Find a cached product whose key contains, or is contained in, the search key"""
+        # Likely candidates first: keys with the same shape token
+        # (Index keys can outlive a refreshed product, so misses are skipped)
+        for cached_key in self._token_index.get(self._shape_token(search_key), ()):
+            if search_key in cached_key or cached_key in search_key:
+                product = self._cached_product(cached_key)
+                if product:
+                    return product
+        
+        # Keys containing the search key are listed under every one of its
+        # n-grams, so only the shortest posting list needs checking
+        grams = {search_key[i:i + FUZZY_MIN_LEN] for i in range(len(search_key) - FUZZY_MIN_LEN + 1)}
+        for cached_key in min((self._ngram_index.get(gram, []) for gram in grams), key=len):
+            if search_key in cached_key:
+                product = self._cached_product(cached_key)
+                if product:
+                    return product
+        
+        # Keys contained in the search key: probe its substrings, longest first
+        for length in range(len(search_key) - 1, FUZZY_MIN_LEN - 1, -1):
+            for start in range(len(search_key) - length + 1):
+                product = self._cached_product(search_key[start:start + length])
+                if product:
+                    return product
+        
+        return None
+    
+    def lookup_by_model(self, model_number: str) -> Optional[CatalogProduct]:
         """
         Look up a product by Model Number.
         
@@ -227,27 +933,36 @@ class ProductDatabase:
             model_number: The model/part number to search for
             
         Returns:
-            Product data dict or None if not found
+            CatalogProduct or None if not found
         """
         self._load_all_products()
         
-        search_key = model_number.strip().lower() if model_number else ''
+        search_key = sys.intern(model_number.strip().lower()) if model_number else ''
         
         # Skip empty or too-short search keys
         if len(search_key) < 3:
             return None
         
         # Direct lookup
-        if search_key in self._product_cache:
-            return self._product_cache[search_key]
+        product = self._cached_product(search_key)
+        if product:
+            return product
         
-        # Fuzzy match - require minimum 4 characters for fuzzy matching
-        if len(search_key) >= 4:
-            for cached_key, data in self._product_cache.items():
-                if len(cached_key) >= 4 and (search_key in cached_key or cached_key in search_key):
-                    return data
+        # Fuzzy/missed query seen before
+        if search_key in self._lookup_memo:
+            return self._lookup_memo[search_key]
         
-        return None
+        # Fuzzy match - require minimum FUZZY_MIN_LEN characters for fuzzy matching
+        result = self._fuzzy_lookup(search_key) if len(search_key) >= FUZZY_MIN_LEN else None
+        self._memoize(self._lookup_memo, search_key, result)
+        return result
+    
+    @staticmethod
+    def _memoize(memo: Dict[str, Any], key: str, value: Any) -> None:
+        """Store a lookup result, starting over once LOOKUP_MEMO_SIZE is reached"""
+        if len(memo) >= LOOKUP_MEMO_SIZE:
+            memo.clear()
+        memo[key] = value
     
     def get_rack_specs(self, model_number: str) -> Optional[Dict]:
         """
@@ -257,79 +972,132 @@ class ProductDatabase:
             Dict with rack_units, weight, btu, watts, subsystem
             or None if not found
         """
-        product = self.lookup_by_model(model_number)
+        self._load_all_products()
         
-        if not product:
-            return None
+        cache_key = model_number.strip().lower() if model_number else ''
+        if cache_key in self._rack_specs_cache:
+            return self._rack_specs_cache[cache_key]
         
-        if not product.get('rack_units') or product.get('rack_units', 0) == 0:
-            return None
+        specs = self._build_rack_specs(self.lookup_by_model(model_number))
+        self._memoize(self._rack_specs_cache, cache_key, specs)
+        return specs
+    
+    def get_rack_specs_bulk(self, model_numbers: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Get rack-relevant specs for many products at once.
         
-        return {
-            'rack_units': product.get('rack_units', 1),
-            'height_u': product.get('height_u', 1),
-            'weight': product.get('weight', 10.0),
-            'watts': product.get('watts', 0),
-            'btu': product.get('btu', 0),
-            'subsystem': product.get('subsystem', 'AV'),
-            'is_rack_mountable': True,
-            'brand': product.get('brand', ''),
-            'model': product.get('model', ''),
-            'connections': product.get('connections', ''),
-            'source': 'mysql'
-        }
-    
-    def get_all_products(self) -> List[Dict]:
-        """Get all products from the catalog"""
+        The catalog is loaded (a single query) before the first lookup and
+        repeated model numbers are resolved once.
+        
+        Returns:
+            Dict mapping each model number to its specs, or None if not found
+        """
         self._load_all_products()
         
-        # Return unique products
-        seen_ids = set()
-        unique_products = []
+        specs_by_model: Dict[str, Optional[Dict]] = {}
+        for model_number in model_numbers:
+            if model_number not in specs_by_model:
+                specs_by_model[model_number] = self.get_rack_specs(model_number)
+        return specs_by_model
+    
+    def _build_rack_specs(self, product: Optional[CatalogProduct]) -> Optional[Dict]:
+        """Rack-relevant fields of a product as a dict, or None if it has no rack units"""
+        if not product or not product.rack_units:
+            return None
+        
+        return {field: getattr(product, field) for field in RACK_SPEC_FIELDS}
+    
+    def get_all_products(self) -> List[CatalogProduct]:
+        """
+        Get all products from the catalog.
+        
+        Served from the cache if it is loaded, otherwise read straight from
+        MySQL without building the lookup indexes.
+        """
+        if self._cache_loaded:
+            self._load_all_products()  # Applies pending writes
+            return list(self._products_by_id.values())
         
-        for product in self._product_cache.values():
-            product_id = product.get('id')
-            if product_id and product_id not in seen_ids:
-                seen_ids.add(product_id)
-                unique_products.append(product)
+        products = []
+        try:
+            with self._connection() as connection:
+                cursor = connection.cursor(dictionary=True, buffered=False)
+                try:
+                    cursor.execute(CATALOG_SELECT_SQL)
+                    for row in cursor:
+                        products.append(_product_from_row(row))
+                finally:
+                    self._close_unbuffered(cursor)
+        except Error as e:
+            print(f"❌ Error loading from MySQL: {e}")
+            raise
         
-        return unique_products
+        return products
     
     def search_products(self, query: str) -> List[Dict]:
-        """Search products by brand, model, or name"""
-        if not self.connection or not self.connection.is_connected():
-            self.connect()
+        """
+        Search products by brand, model, or name.
         
-        search_sql = """
+        Returns every row containing the query in brand, model, name or
+        part_number (as a LIKE substring match), plus rows the FULLTEXT index
+        matches with every word of the query as a prefix, even across columns.
+        The index can't find mid-word matches ("125" in "PAV-SIPA125SM"), so
+        the substring match still scans; the FULLTEXT part is skipped when the
+        query has no indexable word or the table predates the index.
+        """
+        like_sql = """
         SELECT * FROM product_catalog 
         WHERE brand LIKE %s 
            OR model LIKE %s 
            OR name LIKE %s 
            OR part_number LIKE %s
         """
+        search_term = f"%{query}%"
+        like_params = (search_term, search_term, search_term, search_term)
+        
+        # Words only - boolean-mode operators in the query would change its meaning
+        words = [word for word in re.findall(r"\w+", query) if len(word) >= FULLTEXT_MIN_TOKEN]
+        if words:
+            # One statement, so each matching row comes back once
+            fulltext_sql = like_sql + "   OR MATCH(brand, model, name, part_number) AGAINST(%s IN BOOLEAN MODE)\n"
+            try:
+                return self._search(fulltext_sql, like_params + (" ".join(f"+{word}*" for word in words),))
+            except Error as e:
+                if e.errno != ER_FT_MATCHING_KEY_NOT_FOUND:
+                    print(f"❌ Search error: {e}")
+                    return []
         
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            search_term = f"%{query}%"
-            cursor.execute(search_sql, (search_term, search_term, search_term, search_term))
-            rows = cursor.fetchall()
-            cursor.close()
-            return [dict(row) for row in rows]
+            return self._search(like_sql, like_params)
         except Error as e:
             print(f"❌ Search error: {e}")
             return []
+    
+    def _search(self, sql: str, params: tuple) -> List[Dict]:
+        """Rows of a search_products query"""
+        with self._connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            try:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
 
 
 # Singleton instance
 _db: Optional[ProductDatabase] = None
+_db_lock = threading.Lock()
 
 
 def get_database() -> ProductDatabase:
-    """Get or create the database singleton"""
+    """Get or create the database singleton (thread-safe)"""
     global _db
     if _db is None:
-        _db = ProductDatabase()
-        _db.connect()
+        with _db_lock:
+            if _db is None:
+                db = ProductDatabase()
+                db.connect()
+                _db = db
     return _db
 
 
@@ -364,7 +1132,7 @@ if __name__ == "__main__":
         else:
             print("\nFirst 5 products:")
             for p in products[:5]:
-                print(f"  • {p.get('brand', '')} {p.get('model', '')}: {p.get('height_u', 0)}U, {p.get('watts', 0)}W")
+                print(f"  • {p.brand} {p.model}: {p.height_u}U, {p.watts}W")
         
         db.disconnect()
         
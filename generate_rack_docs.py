@@ -17,23 +17,104 @@ Example:
 """
 
 import argparse
+import math
 import os
+import re
 import sys
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 
-from csv_parser import parse_client_csv, get_unique_products_with_quantities, ProductFromCSV, get_rack_info_from_csv
-from openai_client import get_openai_client
+from csv_parser import parse_client_csv_and_racks, get_unique_products_with_quantities, ProductFromCSV
 from rack_arranger import RackItem, RackItemType, arrange_rack, expand_quantities, print_rack_layout
 from pdf_generator import generate_rack_pdf
 
-# MySQL Database support (replaces Airtable)
-try:
-    from db_client import get_database, MYSQL_AVAILABLE
-    DATABASE_AVAILABLE = MYSQL_AVAILABLE
-except (ImportError, ValueError) as e:
-    DATABASE_AVAILABLE = False
-    print(f"ℹ️  MySQL Database not configured: {e}")
+# Keywords to identify network equipment (fallback if no Subsystem)
+NETWORK_BRANDS = ('ubiquiti', 'pakedge', 'araknis', 'cisco', 'netgear', 'access networks')
+NETWORK_MODELS = ('usw-', 'udm-', 'uap-', 'an-', 'ss42', 'switch', 'router', 'gateway')
+
+# Keywords to identify AV equipment (fallback if no Subsystem)
+AV_BRANDS = ('savant', 'lutron', 'sonance', 'james', 'anthem', 'marantz', 'denon',
+             'crown', 'bowers', 'b&k', 'b & k', 'sonos', 'control4')
+AV_MODELS = ('pav-', 'ssc-', 'svr-', 'rck-', 'rmb-', 'cli-', 'pkg-', 'hqp', 'hqr',
+             'amp', 'receiver', 'processor')
+
+
+def _brand_or_model_re(brands, models) -> re.Pattern:
+    """
+    Regex matching "brand\\0model\\0name" when one of the brands is in the
+    brand, or one of the models is in the model or name.
+    """
+    return re.compile(
+        r'^[^\0]*(?:' + '|'.join(map(re.escape, brands)) + r')'
+        r'|\0.*(?:' + '|'.join(map(re.escape, models)) + r')',
+        re.DOTALL
+    )
+
+
+# Network/AV keyword checks, one search over an item's brand, model and name each
+NETWORK_ITEM_RE = _brand_or_model_re(NETWORK_BRANDS, NETWORK_MODELS)
+AV_ITEM_RE = _brand_or_model_re(AV_BRANDS, AV_MODELS)
+
+# Brands the pre-filter always keeps (network gear and MOTU interfaces)
+KEEP_BRANDS = ('araknis', 'ubiquiti', 'cisco', 'netgear', 'pakedge', 'access networks', 'motu')
+
+# Name/category keywords that mark an item as not rack equipment
+SKIP_KEYWORDS = [
+    'pre-wire', 'prewire', 'pre wire',
+    'cable', 'wire ', ' wire', 'wiring',
+    'in-wall', 'in-ceiling', 'in wall', 'in ceiling',
+    'outdoor speaker', 'outdoor monitor',
+    'screen', 'projector mount', 'tv mount',
+    'wallplate', 'wall plate', 'faceplate',
+    'keypad', 'dimmer',
+    'sensor', 'slab sensor',
+    'back box', 'backbox', 'junction',
+    'allowance', 'labor', 'installation',
+]
+
+# Categories that are definitely not rack equipment
+SKIP_CATEGORIES = [
+    'speakers > in-wall', 'speakers > in-ceiling', 'speakers > outdoor',
+    'projection screens', 'mounts', 'wire and cable',
+    'lighting > keypads', 'lighting > dimmers', 'lighting > switches',
+    'motorized window treatments',
+]
+
+# Each list compiled into one alternation, so a product is checked in a
+# single scan instead of one substring test per keyword
+SKIP_KEYWORDS_RE = re.compile('|'.join(map(re.escape, SKIP_KEYWORDS)))
+SKIP_CATEGORIES_RE = re.compile('|'.join(map(re.escape, SKIP_CATEGORIES)))
+
+
+@lru_cache(maxsize=1024)
+def is_network_item(subsystem: str, brand: str, model: str, name: str) -> bool:
+    """
+    Whether an item belongs in the Network rack (see split_into_av_and_network_racks).
+    
+    Cached, since expanded quantities repeat the same item once per unit.
+    """
+    # First, check if Subsystem was set from Airtable Brain
+    subsystem_lower = subsystem.lower()
+    
+    if 'network' in subsystem_lower or 'net' in subsystem_lower:
+        return True
+    elif 'av' in subsystem_lower or 'audio' in subsystem_lower or 'video' in subsystem_lower:
+        return False
+    
+    # Fallback: Use brand/model keywords
+    brand_lower = brand.lower() if brand else ""
+    model_lower = model.lower() if model else ""
+    name_lower = name.lower() if name else ""
+    haystack = f"{brand_lower}\0{model_lower}\0{name_lower}"
+    
+    # Check if it's network equipment, then AV equipment
+    is_network = NETWORK_ITEM_RE.search(haystack) is not None
+    is_av = AV_ITEM_RE.search(haystack) is not None
+    
+    # Categorize - if both match, prefer AV (more common case)
+    # If neither match, put in AV rack (better for power/misc items)
+    return is_network and not is_av
 
 
 def split_into_av_and_network_racks(rack_items: list[RackItem]) -> tuple[list[RackItem], list[RackItem]]:
@@ -53,50 +134,8 @@ def split_into_av_and_network_racks(rack_items: list[RackItem]) -> tuple[list[Ra
     av_items = []
     network_items = []
     
-    # Keywords to identify network equipment (fallback if no Subsystem)
-    network_brands = ['ubiquiti', 'pakedge', 'araknis', 'cisco', 'netgear', 'access networks']
-    network_models = ['usw-', 'udm-', 'uap-', 'an-', 'ss42', 'switch', 'router', 'gateway']
-    
-    # Keywords to identify AV equipment (fallback if no Subsystem)
-    av_brands = ['savant', 'lutron', 'sonance', 'james', 'anthem', 'marantz', 'denon', 
-                 'crown', 'bowers', 'b&k', 'b & k', 'sonos', 'control4']
-    av_models = ['pav-', 'ssc-', 'svr-', 'rck-', 'rmb-', 'cli-', 'pkg-', 'hqp', 'hqr', 
-                'amp', 'receiver', 'processor']
-    
     for item in rack_items:
-        # First, check if Subsystem was set from Airtable Brain
-        subsystem = getattr(item, 'subsystem', None) or ''
-        subsystem_lower = subsystem.lower() if subsystem else ''
-        
-        if 'network' in subsystem_lower or 'net' in subsystem_lower:
-            network_items.append(item)
-            continue
-        elif 'av' in subsystem_lower or 'audio' in subsystem_lower or 'video' in subsystem_lower:
-            av_items.append(item)
-            continue
-        
-        # Fallback: Use brand/model keywords
-        brand_lower = item.brand.lower() if item.brand else ""
-        model_lower = item.model.lower() if item.model else ""
-        name_lower = item.name.lower() if item.name else ""
-        
-        # Check if it's network equipment
-        is_network = (
-            any(nb in brand_lower for nb in network_brands) or
-            any(nm in model_lower for nm in network_models) or
-            any(nm in name_lower for nm in network_models)
-        )
-        
-        # Check if it's AV equipment
-        is_av = (
-            any(ab in brand_lower for ab in av_brands) or
-            any(am in model_lower for am in av_models) or
-            any(am in name_lower for am in av_models)
-        )
-        
-        # Categorize - if both match, prefer AV (more common case)
-        # If neither match, put in AV rack (better for power/misc items)
-        if is_network and not is_av:
+        if is_network_item(item.subsystem, item.brand, item.model, item.name):
             network_items.append(item)
         else:
             av_items.append(item)
@@ -114,54 +153,43 @@ def is_clearly_not_rack_mountable(product) -> bool:
         return True
     
     # Check for non-rack keywords in name/category
-    name = (product.name or '').lower()
-    category = (product.category or '').lower()
-    model = (product.model or '').lower()
-    brand = (product.brand or '').lower()
+    name = product.name_lc
+    category = product.category_lc
+    brand = product.brand_lc
     
     # Network equipment brands - ALWAYS include these
-    network_brands = ['araknis', 'ubiquiti', 'cisco', 'netgear', 'pakedge', 'access networks', 'motu']
-    if any(nb in brand for nb in network_brands):
+    if any(nb in brand for nb in KEEP_BRANDS):
         return False  # Keep network equipment
     
     # Networking category - ALWAYS include
     if 'networking' in category or 'switches' in category:
         return False
     
-    skip_keywords = [
-        'pre-wire', 'prewire', 'pre wire',
-        'cable', 'wire ', ' wire', 'wiring',
-        'in-wall', 'in-ceiling', 'in wall', 'in ceiling',
-        'outdoor speaker', 'outdoor monitor',
-        'screen', 'projector mount', 'tv mount',
-        'wallplate', 'wall plate', 'faceplate',
-        'keypad', 'dimmer',
-        'sensor', 'slab sensor',
-        'back box', 'backbox', 'junction',
-        'allowance', 'labor', 'installation',
-    ]
-    
-    # Categories that are definitely not rack equipment
-    skip_categories = [
-        'speakers > in-wall', 'speakers > in-ceiling', 'speakers > outdoor',
-        'projection screens', 'mounts', 'wire and cable',
-        'lighting > keypads', 'lighting > dimmers', 'lighting > switches',
-        'motorized window treatments',
-    ]
-    
-    combined_text = f"{name} {category}"
-    
-    for keyword in skip_keywords:
-        if keyword in combined_text:
-            return True
-    
-    for skip_cat in skip_categories:
-        if skip_cat in category:
-            return True
+    if SKIP_KEYWORDS_RE.search(f"{name} {category}"):
+        return True
+    
+    if SKIP_CATEGORIES_RE.search(category):
+        return True
     
     return False
 
 
+def load_database():
+    """
+    Import the MySQL client (replaces Airtable) on first use, so runs that
+    skip the database never load it.
+    
+    Returns:
+        get_database, or None if MySQL is not available
+    """
+    try:
+        from db_client import get_database, MYSQL_AVAILABLE
+    except (ImportError, ValueError) as e:
+        print(f"ℹ️  MySQL Database not configured: {e}")
+        return None
+    return get_database if MYSQL_AVAILABLE else None
+
+
 def enrich_products_with_specs(products: list[ProductFromCSV], use_database: bool = True, use_ai: bool = True) -> list[RackItem]:
     """
     Get product specifications and create RackItems.
@@ -173,7 +201,6 @@ def enrich_products_with_specs(products: list[ProductFromCSV], use_database: boo
     """
     rack_items = []
     specs_lookup = {}
-    products_needing_ai = []
     
     # Pre-filter: Skip obviously non-rack items
     filtered_products = []
@@ -186,23 +213,27 @@ def enrich_products_with_specs(products: list[ProductFromCSV], use_database: boo
     products = filtered_products
     print(f"📦 {len(products)} products after pre-filter\n")
     
+    # Spec lookup key of each product ("brand model"), computed once for every step
+    lookup_keys = [f"{product.brand} {product.model}".strip().lower() for product in products]
+    
     # Step 1: Try MySQL Database first
-    if use_database and DATABASE_AVAILABLE:
+    get_database = load_database() if use_database else None
+    if get_database:
         try:
             db = get_database()
             print("✅ Connected to MySQL Product Catalog\n")
             
             print("🗄️  Looking up products in database...")
             db_found = 0
-            missing_models = []
             
-            for product in products:
-                # Try to find in database by model number or part number
-                model_num = product.part_number or product.model
-                db_specs = db.get_rack_specs(model_num)
+            # Find every product by model number or part number in one batch
+            model_nums = [product.part_number or product.model for product in products]
+            db_specs_by_model = db.get_rack_specs_bulk(model_nums)
+            
+            for product, lookup_key, model_num in zip(products, lookup_keys, model_nums):
+                db_specs = db_specs_by_model[model_num]
                 
                 if db_specs:
-                    lookup_key = f"{product.brand} {product.model}".strip().lower()
                     specs_lookup[lookup_key] = db_specs
                     db_found += 1
                     
@@ -212,25 +243,28 @@ def enrich_products_with_specs(products: list[ProductFromCSV], use_database: boo
                     print(f"  🗄️  DB: {product.brand} {product.model}: {db_specs.get('rack_units')}U, {db_specs.get('watts', 0)}W{subsystem_str}")
                 else:
                     # Model not found in database - print warning
-                    missing_models.append(model_num)
                     print(f"  ⚠️  Model [{model_num}] not found in database")
-                    products_needing_ai.append(product)
             
             print(f"\n✅ Found {db_found} products in database")
-            if missing_models:
-                print(f"⚠️  {len(missing_models)} models not in database (will try OpenAI)\n")
+            if db_found < len(products):
+                print(f"⚠️  {len(products) - db_found} models not in database (will try OpenAI)\n")
             
         except Exception as e:
             print(f"⚠️  Database lookup failed: {e}")
-            products_needing_ai = list(products)
-    else:
-        products_needing_ai = list(products)
-        if use_database and not DATABASE_AVAILABLE:
-            print("ℹ️  MySQL Database not configured, using OpenAI only")
+    elif use_database:
+        print("ℹ️  MySQL Database not configured, using OpenAI only")
+    
+    # Products still without specs, one per lookup key: repeated SKUs are
+    # asked about once and share the answer when rack items are built
+    products_needing_ai = {}
+    for product, lookup_key in zip(products, lookup_keys):
+        if lookup_key not in specs_lookup:
+            products_needing_ai.setdefault(lookup_key, product)
     
     # Step 2: Use OpenAI for products not found in Airtable
     if use_ai and products_needing_ai:
         try:
+            from openai_client import get_openai_client
             ai_client = get_openai_client()
             print("✅ Connected to OpenAI\n")
             
@@ -242,7 +276,7 @@ def enrich_products_with_specs(products: list[ProductFromCSV], use_database: boo
                     "category": p.category,
                     "name": p.name
                 }
-                for p in products_needing_ai
+                for p in products_needing_ai.values()
             ]
             
             print(f"📡 Sending {len(products_needing_ai)} products to GPT-4o...")
@@ -262,9 +296,8 @@ def enrich_products_with_specs(products: list[ProductFromCSV], use_database: boo
         print("ℹ️  AI lookup disabled")
     
     # Step 3: Build rack items from specs
-    for product in products:
+    for product, lookup_key in zip(products, lookup_keys):
         # Look up specs
-        lookup_key = f"{product.brand} {product.model}".strip().lower()
         specs = specs_lookup.get(lookup_key, {})
         
         if specs:
@@ -275,7 +308,6 @@ def enrich_products_with_specs(products: list[ProductFromCSV], use_database: boo
             
             rack_units_raw = specs.get('rack_units', 0)
             # Round up fractional rack units (can't have 0.5U in a real rack)
-            import math
             rack_units = math.ceil(rack_units_raw) if rack_units_raw > 0 else 0
             
             if rack_units == 0:
@@ -296,7 +328,7 @@ def enrich_products_with_specs(products: list[ProductFromCSV], use_database: boo
                 btu=specs.get('btu', 0) or product.calculated_btu or 0,
                 connections=specs.get('connections'),
                 quantity=product.quantity,
-                subsystem=specs.get('subsystem', '')  # AV or Network from Brain
+                subsystem=specs.get('subsystem') or ''  # AV or Network from Brain
             )
             rack_items.append(rack_item)
         else:
@@ -445,9 +477,9 @@ Examples:
     print("🔧 AV RACK DOCUMENTATION GENERATOR - Phase 1")
     print("="*60 + "\n")
     
-    # Step 0: Detect racks from CSV
+    # Step 0: Read the CSV once for both its products and its racks
     print(f"📄 Reading CSV: {csv_path}")
-    rack_info = get_rack_info_from_csv(str(csv_path))
+    products, rack_info = parse_client_csv_and_racks(str(csv_path), equipment_location=args.location)
     
     if rack_info['racks']:
         print(f"\n🗄️  Detected {rack_info['total_racks']} rack(s) in CSV:")
@@ -461,8 +493,7 @@ Examples:
     else:
         print(f"\n   ℹ️  No rack enclosures found in CSV, using default: {args.rack_size}U")
     
-    # Step 1: Parse CSV
-    products = parse_client_csv(str(csv_path), equipment_location=args.location)
+    # Step 1: Consolidate parsed products
     products = get_unique_products_with_quantities(products)
     
     if not products:
@@ -6,6 +6,7 @@ Includes persistent caching to avoid redundant API calls
 
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
@@ -25,6 +26,11 @@ except ImportError:
 # Cache file location
 CACHE_FILE = Path(__file__).parent / "product_specs_cache.json"
 
+# Uncached products are sent AI_BATCH_SIZE per request, up to
+# AI_MAX_CONCURRENT requests at a time
+AI_BATCH_SIZE = 20
+AI_MAX_CONCURRENT = 5
+
 
 class ProductSpecsAI:
     """Uses OpenAI to infer AV equipment specifications with persistent caching"""
@@ -95,9 +101,62 @@ class ProductSpecsAI:
         
         print(f"  🌐 Looking up {len(products_to_lookup)} products via OpenAI API...")
         
+        # Smaller requests come back sooner, and several run at once
+        batches = [
+            products_to_lookup[i:i + AI_BATCH_SIZE]
+            for i in range(0, len(products_to_lookup), AI_BATCH_SIZE)
+        ]
+        with ThreadPoolExecutor(max_workers=min(AI_MAX_CONCURRENT, len(batches))) as executor:
+            futures = [executor.submit(self._request_specs, batch) for batch in batches]
+        
+        new_products = 0
+        for batch, future in zip(batches, futures):
+            try:
+                api_products = future.result()
+            except Exception as e:
+                print(f"❌ OpenAI API error: {e}")
+                continue  # Keep cached results and the other batches
+            
+            # The model may echo a product with a corrected brand ("Araknis
+            # Networks"); file those under the key we asked with as well, so
+            # the caller finds them and the next run is a cache hit
+            requested_keys = {
+                str(p.get('model', '')).strip().lower(): f"{p.get('brand', '')} {p.get('model', '')}".strip().lower()
+                for p in batch
+            }
+            
+            # Process API results and add to cache
+            for product in api_products:
+                key = f"{product.get('brand', '')} {product.get('model', '')}".strip().lower()
+                requested_key = requested_keys.get(str(product.get('model', '')).strip().lower())
+                spec_data = {
+                    "rack_units": product.get("rack_units", 1),
+                    "weight": product.get("weight", 10.0),
+                    "btu": product.get("btu", 100),
+                    "is_rack_mountable": product.get("is_rack_mountable", True),
+                    "connections": product.get("connections", {})
+                }
+                # Add to results and cache
+                results[key] = spec_data
+                self._cache[key] = spec_data
+                if requested_key and requested_key != key:
+                    results[requested_key] = spec_data
+                    self._cache[requested_key] = spec_data
+            
+            new_products += len(batch)
+        
+        # Save updated cache to disk
+        if new_products:
+            self._save_cache()
+            print(f"  💾 Saved {new_products} new products to cache")
+        
+        return results
+    
+    def _request_specs(self, products: list[dict]) -> list[dict]:
+        """Ask GPT for the specs of one batch of products (raises on API or JSON errors)"""
         # Build the product list for the prompt
         product_list = []
-        for i, p in enumerate(products_to_lookup, 1):
+        for i, p in enumerate(products, 1):
             product_list.append(
                 f"{i}. {p.get('brand', '')} {p.get('model', '')} - {p.get('category', '')} - {p.get('name', '')}"
             )
@@ -166,50 +225,26 @@ Respond with ONLY valid JSON in this exact format:
 }}
 """
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert AV systems integrator with deep knowledge of professional audio/video equipment specifications. Always respond with valid JSON only."
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                temperature=0.1,  # Low temperature for consistency
-                response_format={"type": "json_object"}
-            )
-            
-            # Parse the response
-            content = response.choices[0].message.content
-            data = json.loads(content)
-            
-            # Process API results and add to cache
-            for product in data.get("products", []):
-                key = f"{product.get('brand', '')} {product.get('model', '')}".strip().lower()
-                spec_data = {
-                    "rack_units": product.get("rack_units", 1),
-                    "weight": product.get("weight", 10.0),
-                    "btu": product.get("btu", 100),
-                    "is_rack_mountable": product.get("is_rack_mountable", True),
-                    "connections": product.get("connections", {})
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert AV systems integrator with deep knowledge of professional audio/video equipment specifications. Always respond with valid JSON only."
+                },
+                {
+                    "role": "user", 
+                    "content": prompt
                 }
-                # Add to results and cache
-                results[key] = spec_data
-                self._cache[key] = spec_data
-            
-            # Save updated cache to disk
-            self._save_cache()
-            print(f"  💾 Saved {len(products_to_lookup)} new products to cache")
-            
-            return results
-            
-        except Exception as e:
-            print(f"❌ OpenAI API error: {e}")
-            return results  # Return any cached results we found
+            ],
+            temperature=0.1,  # Low temperature for consistency
+            response_format={"type": "json_object"}
+        )
+        
+        # Parse the response
+        content = response.choices[0].message.content
+        data = json.loads(content)
+        return data.get("products", [])
     
     def get_single_product_specs(self, brand: str, model: str, category: str = "") -> Optional[dict]:
         """Get specs for a single product"""
@@ -79,6 +79,9 @@ class RackElevationPDF:
         # Margins
         self.margin = 0.5 * inch
         
+        # (text, font, size) -> width; vent/blank labels repeat on every page
+        self._string_widths = {}
+        
     def generate(self, layout: RackLayout) -> str:
         """
         Generate a PDF rack elevation document with a single rack.
@@ -162,6 +165,14 @@ class RackElevationPDF:
         # Draw U numbers on left side of rack
         self._draw_u_numbers(c, layout, rack_x, rack_y)
     
+    def _string_width(self, c: canvas.Canvas, text: str, font: str, size: float) -> float:
+        """Width of text in the given font, cached per (text, font, size)"""
+        key = (text, font, size)
+        width = self._string_widths.get(key)
+        if width is None:
+            width = self._string_widths[key] = c.stringWidth(text, font, size)
+        return width
+    
     def _draw_title_block(self, c: canvas.Canvas, layout: RackLayout) -> None:
         """Draw the title block at top of page"""
         
@@ -181,7 +192,7 @@ class RackElevationPDF:
         # Project name (center)
         c.setFont("Helvetica-Bold", 14)
         project_text = f"Project: {self.project_name}"
-        text_width = c.stringWidth(project_text, "Helvetica-Bold", 14)
+        text_width = self._string_width(c, project_text, "Helvetica-Bold", 14)
         c.drawString(self.page_width / 2 - text_width / 2, title_y + 0.5 * inch, project_text)
         
         # Rack info
@@ -193,7 +204,7 @@ class RackElevationPDF:
         c.setFont("Helvetica", 10)
         date_str = datetime.now().strftime("%Y-%m-%d")
         rev_text = f"Rev: {self.revision}  |  Date: {date_str}"
-        text_width = c.stringWidth(rev_text, "Helvetica", 10)
+        text_width = self._string_width(c, rev_text, "Helvetica", 10)
         c.drawString(self.page_width - self.margin - text_width - 0.2 * inch, title_y + 0.2 * inch, rev_text)
         
         # Page title
@@ -291,7 +302,7 @@ class RackElevationPDF:
                 label = label[:max_chars-3] + "..."
             
             # Center the text
-            text_width = c.stringWidth(label, "Helvetica-Bold", base_font_size)
+            text_width = self._string_width(c, label, "Helvetica-Bold", base_font_size)
             text_x = item_x + (item_width - text_width) / 2
             text_y = y + height / 2 - base_font_size / 3
             
@@ -307,7 +318,7 @@ class RackElevationPDF:
                 small_font = max(4, base_font_size - 1)
                 c.setFont("Helvetica", small_font)
                 label = item.display_name
-                text_width = c.stringWidth(label, "Helvetica", small_font)
+                text_width = self._string_width(c, label, "Helvetica", small_font)
                 text_x = item_x + (item_width - text_width) / 2
                 text_y = y + height / 2 - small_font / 3
                 c.drawString(text_x, text_y, label)